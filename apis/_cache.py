@@ -0,0 +1,61 @@
+"""
+In-process TTL cache for slow-changing API responses
+"""
+
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+def _evict(store: Dict[Tuple, Tuple[float, Any]], now: float, max_size: int):
+    """Drop expired entries, then the oldest ones, until the store fits"""
+    for key in [key for key, (expires, _) in store.items() if expires <= now]:
+        del store[key]
+    while len(store) > max_size:
+        del store[next(iter(store))]
+
+def ttl_cache(
+    seconds: float,
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    max_size: Optional[int] = None
+):
+    """
+    Cache an async fetcher's result for `seconds`, keyed on its arguments
+    
+    cache_if: optional predicate, only results that pass it are cached
+    max_size: optional bound for caches keyed on open-ended ids - expired
+              entries are evicted first, then the oldest inserted
+    
+    Fetchers return an empty value on error, so an empty result never
+    overwrites a cached one - the stale value is served instead
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        store: Dict[Tuple, Tuple[float, Any]] = {}
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(sorted(bound.arguments.items()))
+            
+            now = time.monotonic()
+            entry = store.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            
+            value = await func(*args, **kwargs)
+            if not value:
+                # Fetch failed (or came back empty) - fall back to stale data
+                return entry[1] if entry is not None else value
+            
+            if cache_if is None or cache_if(value):
+                store.pop(key, None)  # Re-insert so dict order tracks age
+                store[key] = (now + seconds, value)
+                if max_size is not None and len(store) > max_size:
+                    _evict(store, now, max_size)
+            return value
+        
+        wrapper.cache_clear = store.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,98 @@
+"""
+Shared HTTP client for all API modules
+Keeps one pooled httpx.AsyncClient per event loop so connections are reused
+"""
+
+import asyncio
+import ssl
+import weakref
+from urllib.parse import urlsplit
+import httpx
+import config
+from tui.logger import tui_print
+
+# One client per running event loop (a client must not cross loops)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+# Built once so the CA bundle is parsed a single time and TLS sessions are reused
+_SSL_CONTEXT = ssl.create_default_context()
+
+_connection_logged = False
+
+async def _log_connection_info(response: httpx.Response):
+    """Log the negotiated protocol and content encoding once to confirm HTTP/2 and compression"""
+    global _connection_logged
+    if _connection_logged:
+        return
+    _connection_logged = True
+    encoding = response.headers.get("content-encoding", "identity")
+    tui_print(f"🌐 HTTP client connected via {response.http_version} (encoding: {encoding})")
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared client for the running event loop
+    Created lazily on first use and reused for every request afterwards
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            verify=_SSL_CONTEXT if config.HTTP_VERIFY_TLS else False,
+            http2=config.HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=config.HTTP_TIMEOUT,
+            headers={"Accept-Encoding": "gzip, br"},
+            event_hooks={"response": [_log_connection_info]}
+        )
+        _clients[loop] = client
+    return client
+
+async def warm_dns():
+    """
+    Resolve every API host once at startup
+    Primes the system resolver cache so the first real request skips the DNS round trip
+    """
+    loop = asyncio.get_running_loop()
+    hosts = {urlsplit(url).hostname for url in config.PREWARM_URLS}
+    results = await asyncio.gather(
+        *(loop.getaddrinfo(host, 443) for host in hosts),
+        return_exceptions=True
+    )
+    failed = [host for host, result in zip(hosts, results) if isinstance(result, Exception)]
+    if failed:
+        tui_print(f"⚠️  DNS warmup failed for: {', '.join(sorted(failed))}")
+
+async def prewarm():
+    """
+    Warm DNS for every API host, then open a pooled connection to each
+    Polymarket host with a HEAD request so the first real call skips the
+    TCP and TLS handshakes
+    """
+    await warm_dns()
+    client = get_client()
+    results = await asyncio.gather(
+        *(client.head(url) for url in config.PREWARM_CONNECT_URLS),
+        return_exceptions=True
+    )
+    failed = [
+        url for url, result in zip(config.PREWARM_CONNECT_URLS, results)
+        if isinstance(result, Exception)
+    ]
+    if failed:
+        tui_print(f"⚠️  Connection warmup failed for: {', '.join(failed)}")
+
+async def aclose_all():
+    """
+    Close the shared clients (call on shutdown)
+    Only the client bound to the running loop can be closed cleanly,
+    clients from other loops are just dropped
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    _clients.clear()
+    if client is not None and not client.is_closed:
+        await client.aclose()
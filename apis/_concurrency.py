@@ -0,0 +1,20 @@
+"""
+Concurrency helpers for API fan-outs
+"""
+
+import asyncio
+from typing import Any, Awaitable, Iterable, List
+
+async def gather_limited(coros: Iterable[Awaitable[Any]], limit: int = 16) -> List[Any]:
+    """
+    Like asyncio.gather, but runs at most `limit` awaitables at once
+    Keeps large fan-outs from opening hundreds of sockets and tripping rate limits
+    Results are returned in input order
+    """
+    sem = asyncio.Semaphore(limit)
+    
+    async def _run(coro: Awaitable[Any]) -> Any:
+        async with sem:
+            return await coro
+    
+    return await asyncio.gather(*(_run(coro) for coro in coros))
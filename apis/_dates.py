@@ -0,0 +1,25 @@
+"""
+Timestamp parsing for API date strings (Gamma endDate, resolutionTime, ...)
+"""
+
+from datetime import datetime, timezone
+
+try:
+    # C parser, several times faster than fromisoformat and handles "Z" natively
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    def _parse_datetime(value: str) -> datetime:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value)
+
+def parse_iso_timestamp(value: str) -> float:
+    """
+    Epoch seconds of an ISO-8601 string such as "2024-02-02T12:00:00Z"
+    Strings without an offset are taken as UTC
+    Raises ValueError on malformed input
+    """
+    parsed = _parse_datetime(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
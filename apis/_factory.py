@@ -0,0 +1,65 @@
+"""
+Fetcher factory for simple GET-and-decode endpoints
+Builds one specialized coroutine per endpoint instead of repeating the
+client/raise_for_status/decode/error-logging boilerplate in every function
+"""
+
+import httpx
+import orjson
+from typing import Any, Awaitable, Callable, Dict, Optional
+from apis._client import get_client
+from tui.logger_async import tui_print_nowait
+
+def make_fetcher(
+    url: str,
+    label: str,
+    default_params: Optional[Dict[str, Any]] = None,
+    list_result: bool = True
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Build a fetcher for a fixed endpoint
+    
+    url: full URL, may contain positional {} placeholders filled from call args
+    label: name used in log messages, formatted with the call args and params
+    default_params: query params sent on every call (call kwargs override them)
+    list_result: endpoint returns a JSON array - errors/non-lists give [],
+                 otherwise errors give None
+    
+    The returned coroutine is called as fetch(*path_args, **params)
+    """
+    # Pre-resolved references so the hot body only does local lookups
+    _get_client = get_client
+    _loads = orjson.loads
+    _print = tui_print_nowait
+    _HTTPStatusError = httpx.HTTPStatusError
+    _defaults = dict(default_params or {})
+    _url = url
+    _label = label
+    _list_result = list_result
+    
+    async def _fetch(*path_args: Any, **params: Any) -> Any:
+        merged = {**_defaults, **params}
+        try:
+            response = await _get_client().get(
+                _url.format(*path_args) if path_args else _url,
+                params=merged or None
+            )
+            response.raise_for_status()
+            data = _loads(response.content)
+        except _HTTPStatusError as e:
+            name = _label.format(*path_args, **merged)
+            if e.response.status_code == 404:
+                _print(f"⚠️  Not found: {name}")
+            else:
+                _print(f"❌ HTTP {e.response.status_code} fetching {name}")
+                _print(f"   Response: {e.response.text[:200]}")
+            return [] if _list_result else None
+        except Exception as e:
+            _print(f"❌ Error fetching {_label.format(*path_args, **merged)}: {type(e).__name__}: {e}")
+            return [] if _list_result else None
+        
+        if _list_result and not isinstance(data, list):
+            return []
+        return data
+    
+    return _fetch
@@ -0,0 +1,17 @@
+"""
+Import guard for API modules that keep module-level state
+"""
+
+import sys
+
+def ensure_single_import(name: str, path: str):
+    """
+    Raise if the module at `path` is already loaded under another name
+    Two copies would each keep their own client/cache tables and drift apart
+    """
+    for other_name, module in list(sys.modules.items()):
+        if other_name != name and getattr(module, "__file__", None) == path:
+            raise ImportError(
+                f"{path} imported twice (as {other_name!r} and {name!r}) - "
+                f"import it via the apis package only"
+            )
@@ -0,0 +1,36 @@
+"""
+Single-flight deduplication for concurrent identical API calls
+"""
+
+import asyncio
+import functools
+import inspect
+from typing import Dict, Tuple
+
+def singleflight(func):
+    """
+    Share one in-flight call between concurrent callers with the same arguments
+    
+    The first caller starts the request, later callers await the same task
+    until it finishes. Complements ttl_cache, which only helps once a result
+    has landed.
+    """
+    signature = inspect.signature(func)
+    inflight: Dict[Tuple, asyncio.Task] = {}
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(sorted(bound.arguments.items()))
+        
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        
+        # Shield so one caller cancelling doesn't cancel the shared request
+        return await asyncio.shield(task)
+    
+    return wrapper
@@ -0,0 +1,35 @@
+"""
+Streaming JSON helpers
+Parse large JSON array responses incrementally instead of materializing the whole body
+"""
+
+import httpx
+import ijson
+from typing import Any, AsyncIterator
+
+class _AsyncByteReader:
+    """Adapts an httpx streaming response to the async read(n) file API ijson expects"""
+    
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+    
+    async def read(self, size: int = -1) -> bytes:
+        if not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+async def stream_json_array(response: httpx.Response, prefix: str = "item") -> AsyncIterator[Any]:
+    """
+    Yield the elements of a streamed JSON array one at a time
+    Peak memory is bounded to one element rather than the full payload
+    A non-array body yields nothing
+    """
+    async for item in ijson.items_async(_AsyncByteReader(response), prefix, use_float=True):
+        yield item
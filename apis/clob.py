@@ -4,39 +4,74 @@ Handles live prices and orderbook data
 """
 
 import httpx
+import orjson
 import asyncio
 from typing import Dict, Any, Optional, List
+from urllib.parse import quote_plus
 import config
-from tui.logger import tui_print
+from apis import data
+from apis._client import get_client
+from apis._concurrency import gather_limited
+from tui.logger_async import tui_print_nowait
+
+# Fixed-schema endpoint, URL is formatted directly instead of via params=
+_BOOK_URL = f"{config.CLOB_API_BASE}/book?token_id="
+
+def _price_pair(price: float) -> Dict[str, float]:
+    """Wrap a single token price into the YES/NO shape callers expect"""
+    return {"yes": price, "no": 1.0 - price}
+
+class _PriceBatcher:
+    """
+    Coalesces single-token price lookups into one batch /prices request
+    Requests arriving within the batch window share a single round trip
+    """
+    
+    def __init__(self, window_ms: float):
+        self.window = window_ms / 1000.0
+        self.pending: Dict[str, List[asyncio.Future]] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+    
+    def submit(self, token_id: str, fut: asyncio.Future):
+        """Queue a lookup and make sure a flush is scheduled"""
+        self.pending.setdefault(token_id, []).append(fut)
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self._flush())
+    
+    async def _flush(self):
+        """Wait out the window, then resolve every queued lookup with one request"""
+        await asyncio.sleep(self.window)
+        
+        # Take ownership of the batch so new submissions open a fresh window
+        pending, self.pending = self.pending, {}
+        self.flush_task = None
+        
+        prices = {}
+        try:
+            prices = await fetch_multiple_prices(list(pending))
+        finally:
+            for token_id, futures in pending.items():
+                result = prices.get(token_id)
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_result(result)
+
+_price_batcher = _PriceBatcher(config.PRICE_BATCH_WINDOW_MS)
 
 async def fetch_market_price(token_id: str) -> Optional[Dict[str, Any]]:
     """
     Fetch current YES/NO prices for a market token
     Returns dict with 'yes' and 'no' prices
+    Lookups are micro-batched into a single /prices request per window
     """
     # Validate token_id is a string
     if not token_id or not isinstance(token_id, str):
-        tui_print(f"Invalid token_id: {token_id} (type: {type(token_id)})")
+        tui_print_nowait(f"Invalid token_id: {token_id} (type: {type(token_id)})")
         return None
     
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            response = await client.get(
-                f"{config.CLOB_API_BASE}/price",
-                params={"token_id": token_id},
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            tui_print(f"Error fetching price for {token_id} (HTTP {e.response.status_code}): {e.response.text[:200]}")
-            return None
-        except ValueError as e:
-            tui_print(f"Error parsing price response for {token_id} (invalid JSON): {e}")
-            return None
-        except Exception as e:
-            tui_print(f"Error fetching price for {token_id}: {e}")
-            return None
+    fut = asyncio.get_running_loop().create_future()
+    _price_batcher.submit(token_id, fut)
+    return await fut
 
 async def fetch_orderbook(token_id: str, side: str = "BUY") -> Optional[Dict[str, Any]]:
     """
@@ -44,18 +79,14 @@ async def fetch_orderbook(token_id: str, side: str = "BUY") -> Optional[Dict[str
     side: "BUY" or "SELL"
     Returns orderbook with bids/asks
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            response = await client.get(
-                f"{config.CLOB_API_BASE}/book",
-                params={"token_id": token_id, "side": side},
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            tui_print(f"Error fetching orderbook for {token_id}: {e}")
-            return None
+    client = get_client()
+    try:
+        response = await client.get(f"{_BOOK_URL}{quote_plus(token_id)}&side={side}")
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except Exception as e:
+        tui_print_nowait(f"Error fetching orderbook for {token_id}: {e}")
+        return None
 
 async def check_liquidity(token_id: str, min_liquidity: float = 10.0) -> bool:
     """
@@ -74,13 +105,22 @@ async def check_liquidity(token_id: str, min_liquidity: float = 10.0) -> bool:
 
 async def fetch_multiple_prices(token_ids: List[str]) -> Dict[str, Dict[str, Any]]:
     """
-    Fetch prices for multiple tokens in parallel
+    Fetch prices for multiple tokens via the batch /prices endpoint
+    Large lists are split into chunks fetched in parallel (bounded concurrency)
     Returns dict mapping token_id to price data
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        tasks = []
-        for token_id in token_ids:
-            tasks.append(fetch_market_price(token_id))
-        
-        results = await asyncio.gather(*tasks)
-        return {token_id: result for token_id, result in zip(token_ids, results) if result}
+    if not token_ids:
+        return {}
+    
+    size = config.PRICE_BATCH_MAX_TOKENS
+    chunks = [token_ids[i:i + size] for i in range(0, len(token_ids), size)]
+    results = await gather_limited(
+        (data.fetch_market_prices(chunk) for chunk in chunks),
+        config.API_CONCURRENCY_LIMIT
+    )
+    
+    prices = {}
+    for chunk_prices in results:
+        for token_id, price in chunk_prices.items():
+            prices[token_id] = _price_pair(price)
+    return prices
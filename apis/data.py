@@ -3,11 +3,73 @@ Data API client for Polymarket
 Handles leaderboard and whale activity tracking
 """
 
+import asyncio
+import traceback
 import httpx
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import List, Dict, Any, Optional, AsyncIterator
+from urllib.parse import quote_plus
 import config
+from apis._guard import ensure_single_import
+from apis._cache import ttl_cache
+from apis._client import get_client
+from apis._concurrency import gather_limited
+from apis._inflight import singleflight
+from apis._stream import stream_json_array
 from tui.logger import tui_print
+from tui.logger_async import tui_print_nowait
 
+ensure_single_import(__name__, __file__)
+
+# Legacy shorthand periods accepted by fetch_leaderboard
+_TIME_PERIOD_ALIASES = {"1d": "DAY", "7d": "WEEK", "30d": "MONTH", "all": "ALL"}
+
+# Pricing API endpoint, URL is formatted directly instead of via params=
+_PRICES_URL = f"{config.CLOB_API_BASE}/prices?token_ids="
+
+async def fetch_leaderboard_stream(
+    time_period: str = "WEEK",
+    limit: int = 50,
+    order_by: str = "PNL",
+    category: str = "OVERALL"
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream leaderboard entries one at a time (see fetch_leaderboard for params)
+    Lets callers filter or stop early without loading the full list
+    A failure before the first entry ends the stream empty; once entries
+    have been yielded it is re-raised so a truncated list is never mistaken
+    for a complete one
+    """
+    client = get_client()
+    yielded = False
+    try:
+        url = f"{config.DATA_API_BASE}/v1/leaderboard"
+        params = {
+            "category": category,
+            "timePeriod": _TIME_PERIOD_ALIASES.get(time_period, time_period),
+            "orderBy": order_by,
+            "limit": min(limit, 50)  # API max is 50
+        }
+        
+        tui_print(f"🔍 Fetching leaderboard: {url} with params {params}")
+        
+        async with client.stream("GET", url, params=params) as response:
+            response.raise_for_status()
+            async for trader in stream_json_array(response):
+                yielded = True
+                yield trader
+        
+    except httpx.HTTPStatusError as e:
+        tui_print_nowait(f"❌ HTTP error fetching leaderboard: {e.response.status_code}")
+    except Exception as e:
+        tui_print_nowait(f"❌ Error fetching leaderboard: {type(e).__name__}: {e}")
+        if config.DEBUG_TRACEBACKS:
+            tui_print_nowait(f"Traceback: {traceback.format_exc()[:300]}")
+        if yielded:
+            raise
+
+# Failures return [] - only a fetched leaderboard is cached
+@ttl_cache(config.LEADERBOARD_CACHE_TTL, cache_if=bool)
 async def fetch_leaderboard(
     time_period: str = "WEEK",
     limit: int = 50,
@@ -20,69 +82,73 @@ async def fetch_leaderboard(
     order_by: "PNL" (profit), "VOL" (volume)
     category: "OVERALL", "CRYPTO", "SPORTS", "POLITICS", etc.
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            url = f"{config.DATA_API_BASE}/v1/leaderboard"
-            params = {
-                "category": category,
-                "timePeriod": time_period,
-                "orderBy": order_by,
-                "limit": min(limit, 50)  # API max is 50
-            }
-            
-            tui_print(f"🔍 Fetching leaderboard: {url} with params {params}")
-            
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            tui_print(f"✓ Leaderboard fetched: {len(data) if isinstance(data, list) else 'unknown'} traders")
-            return data if isinstance(data, list) else []
-            
-        except httpx.HTTPStatusError as e:
-            tui_print(f"❌ HTTP error fetching leaderboard: {e.response.status_code}")
-            tui_print(f"Response: {e.response.text[:200]}")
-            return []
-        except Exception as e:
-            tui_print(f"❌ Error fetching leaderboard: {type(e).__name__}: {e}")
-            import traceback
-            tui_print(f"Traceback: {traceback.format_exc()[:300]}")
-            return []
+    try:
+        traders = [trader async for trader in fetch_leaderboard_stream(time_period, limit, order_by, category)]
+    except Exception:
+        return []  # Stream broke off part way (already logged)
+    tui_print(f"✓ Leaderboard fetched: {len(traders)} traders")
+    return traders
 
 async def fetch_wallet_activity(wallet_address: str) -> Optional[Dict[str, Any]]:
     """
     Fetch recent activity for a specific wallet
     Returns trades, positions, and performance metrics
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            response = await client.get(
-                f"{config.DATA_API_BASE}/activity",
-                params={"wallet": wallet_address},
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            tui_print(f"Error fetching activity for {wallet_address}: {e}")
-            return None
+    client = get_client()
+    try:
+        response = await client.get(
+            f"{config.DATA_API_BASE}/activity",
+            params={"wallet": wallet_address}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except Exception as e:
+        tui_print_nowait(f"Error fetching activity for {wallet_address}: {e}")
+        return None
 
 async def fetch_wallet_positions(wallet_address: str) -> List[Dict[str, Any]]:
     """
     Fetch current open positions for a wallet
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            response = await client.get(
-                f"{config.DATA_API_BASE}/positions",
-                params={"wallet": wallet_address},
-                timeout=10.0
-            )
+    client = get_client()
+    try:
+        response = await client.get(
+            f"{config.DATA_API_BASE}/positions",
+            params={"wallet": wallet_address}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except Exception as e:
+        tui_print_nowait(f"Error fetching positions for {wallet_address}: {e}")
+        return []
+
+async def fetch_wallet_trades_stream(
+    wallet_address: str,
+    limit: int = 50
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream recent trades for a wallet one at a time
+    Endpoint: GET /trades?user=<address>&limit=<limit>
+    """
+    client = get_client()
+    try:
+        # Correct endpoint with user parameter
+        url = f"{config.DATA_API_BASE}/trades"
+        params = {
+            "user": wallet_address,
+            "limit": limit
+        }
+        
+        async with client.stream("GET", url, params=params) as response:
             response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            tui_print(f"Error fetching positions for {wallet_address}: {e}")
-            return []
+            async for trade in stream_json_array(response):
+                yield trade
+        
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            tui_print_nowait(f"⚠️  No trades found for wallet {wallet_address[:10]}...")
+        else:
+            tui_print_nowait(f"❌ Error fetching trades for {wallet_address[:10]}...: {type(e).__name__}: {e}")
 
 async def fetch_wallet_trades(
     wallet_address: str,
@@ -92,66 +158,78 @@ async def fetch_wallet_trades(
     Fetch recent trades for a wallet
     Endpoint: GET /trades?user=<address>&limit=<limit>
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            # Correct endpoint with user parameter
-            url = f"{config.DATA_API_BASE}/trades"
-            params = {
-                "user": wallet_address,
-                "limit": limit
-            }
-            
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data and len(data) > 0:
-                tui_print(f"  ✓ Fetched {len(data)} trades for {wallet_address[:10]}...")
-                # Show sample trade structure for debugging
-                if len(data) > 0:
-                    tui_print(f"    Sample trade keys: {list(data[0].keys())[:10]}")
-            
-            return data if isinstance(data, list) else []
-            
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                tui_print(f"⚠️  No trades found for wallet {wallet_address[:10]}...")
-            else:
-                tui_print(f"❌ Error fetching trades for {wallet_address[:10]}...: {type(e).__name__}: {e}")
-            return []
+    data = [trade async for trade in fetch_wallet_trades_stream(wallet_address, limit)]
+    
+    if data:
+        tui_print(f"  ✓ Fetched {len(data)} trades for {wallet_address[:10]}...")
+        # Show sample trade structure for debugging
+        tui_print(f"    Sample trade keys: {list(data[0].keys())[:10]}")
+    
+    return data
 
+async def fetch_wallet_bundle(wallet_address: str) -> Dict[str, Any]:
+    """
+    Fetch positions, recent trades and activity for one wallet concurrently
+    Returns dict with 'wallet', 'positions', 'trades' and 'activity' keys
+    """
+    positions, trades, activity = await asyncio.gather(
+        fetch_wallet_positions(wallet_address),
+        fetch_wallet_trades(wallet_address),
+        fetch_wallet_activity(wallet_address)
+    )
+    return {
+        "wallet": wallet_address,
+        "positions": positions,
+        "trades": trades,
+        "activity": activity
+    }
+
+async def fetch_many_bundles(
+    wallet_addresses: List[str],
+    limit: int = config.API_CONCURRENCY_LIMIT
+) -> List[Dict[str, Any]]:
+    """
+    Fetch wallet bundles for many wallets (e.g. a whole leaderboard) with bounded concurrency
+    All 3N requests share the pooled client's keep-alive connections
+    Returns bundles in the same order as wallet_addresses
+    """
+    return await gather_limited(
+        (fetch_wallet_bundle(wallet) for wallet in wallet_addresses),
+        limit
+    )
+
+@singleflight
 async def fetch_market_from_trades(condition_id: str) -> Optional[Dict[str, Any]]:
     """
     Fetch market metadata (title, slug, etc.) using Condition ID
     by querying the trades endpoint with limit=1
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            # Use query parameter 'market' for Condition ID as per docs
-            url = f"{config.DATA_API_BASE}/trades"
-            params = {
-                "market": condition_id,
-                "limit": 1
-            }
-            
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            # Return the first trade object which contains market metadata (title, slug, etc)
-            if data and isinstance(data, list) and len(data) > 0:
-                market_data = data[0]
-                # Map 'title' to 'question' to match expected format if needed, or caller handles it
-                if "question" not in market_data and "title" in market_data:
-                    market_data["question"] = market_data["title"]
-                return market_data
-            
-            return None
-            
-        except Exception as e:
-            tui_print(f"Error fetching market info from trades for {condition_id}: {e}")
-            return None
+    client = get_client()
+    try:
+        # Use query parameter 'market' for Condition ID as per docs
+        url = f"{config.DATA_API_BASE}/trades"
+        params = {
+            "market": condition_id,
+            "limit": 1
+        }
+        
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        # Return the first trade object which contains market metadata (title, slug, etc)
+        if data and isinstance(data, list) and len(data) > 0:
+            market_data = data[0]
+            # Map 'title' to 'question' to match expected format if needed, or caller handles it
+            if "question" not in market_data and "title" in market_data:
+                market_data["question"] = market_data["title"]
+            return market_data
+        
+        return None
+        
+    except Exception as e:
+        tui_print_nowait(f"Error fetching market info from trades for {condition_id}: {e}")
+        return None
 
 async def fetch_market_prices(token_ids: List[str]) -> Dict[str, float]:
     """
@@ -165,37 +243,30 @@ async def fetch_market_prices(token_ids: List[str]) -> Dict[str, float]:
     
     API Docs: https://docs.polymarket.com/api-reference/pricing/get-multiple-market-prices
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            # Polymarket Pricing API endpoint
-            url = "https://clob.polymarket.com/prices"
-            
-            # Token IDs should be comma-separated
-            params = {
-                "token_ids": ",".join(token_ids)
-            }
-            
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Response format: {"token_id": "0.XX", ...}
-            # Convert string prices to floats
-            prices = {}
-            for token_id, price_str in data.items():
-                try:
-                    prices[token_id] = float(price_str)
-                except (ValueError, TypeError):
-                    tui_print(f"⚠️  Invalid price for token {token_id}: {price_str}")
-                    prices[token_id] = 0.0
-            
-            return prices
-            
-        except httpx.HTTPStatusError as e:
-            tui_print(f"❌ HTTP error fetching Polymarket prices: {e.response.status_code}")
-            tui_print(f"Response: {e.response.text[:200]}")
-            return {}
-        except Exception as e:
-            tui_print(f"❌ Error fetching Polymarket prices: {type(e).__name__}: {e}")
-            return {}
+    client = get_client()
+    try:
+        # Token IDs should be comma-separated (joined and quoted once)
+        response = await client.get(f"{_PRICES_URL}{quote_plus(','.join(token_ids))}")
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        
+        # Response format: {"token_id": "0.XX", ...}
+        # Convert string prices to floats
+        prices = {}
+        for token_id, price_str in data.items():
+            try:
+                prices[token_id] = float(price_str)
+            except (ValueError, TypeError):
+                tui_print_nowait(f"⚠️  Invalid price for token {token_id}: {price_str}")
+                prices[token_id] = 0.0
+        
+        return prices
+        
+    except httpx.HTTPStatusError as e:
+        tui_print_nowait(f"❌ HTTP error fetching Polymarket prices: {e.response.status_code}")
+        tui_print_nowait(f"Response: {e.response.text[:200]}")
+        return {}
+    except Exception as e:
+        tui_print_nowait(f"❌ Error fetching Polymarket prices: {type(e).__name__}: {e}")
+        return {}
@@ -3,126 +3,167 @@ Gamma API client for Polymarket
 Handles market discovery, NegRisk events, and resolution status
 """
 
-import httpx
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 import config
+from apis._guard import ensure_single_import
+from apis._cache import ttl_cache
+from apis._concurrency import gather_limited
+from apis._factory import make_fetcher
+from apis._inflight import singleflight
 from tui.logger import tui_print
 
+ensure_single_import(__name__, __file__)
+
+# Residual client-side crypto filter (one regex pass instead of a per-term scan)
+_CRYPTO_RE = re.compile("|".join(map(re.escape, config.CRYPTO_KEYWORDS)), re.IGNORECASE)
+
+# Gamma tag id for crypto markets, resolved once via /tags/slug
+_crypto_tag_id: Optional[str] = None
+
+# Endpoint fetchers
+_fetch_negrisk_events = make_fetcher(
+    f"{config.GAMMA_API_BASE}/events", "NegRisk events",
+    default_params={"negRisk": "true", "closed": "false"}
+)
+_fetch_market_by_id = make_fetcher(
+    f"{config.GAMMA_API_BASE}/markets/{{}}", "market {0}", list_result=False
+)
+_fetch_markets_by_ids = make_fetcher(
+    f"{config.GAMMA_API_BASE}/markets", "markets by id"
+)
+_fetch_markets_by_condition = make_fetcher(
+    f"{config.GAMMA_API_BASE}/markets", "market {conditionId}"
+)
+_fetch_tag_by_slug = make_fetcher(
+    f"{config.GAMMA_API_BASE}/tags/slug/{{}}", "tag {0}", list_result=False
+)
+_fetch_open_markets = make_fetcher(
+    f"{config.GAMMA_API_BASE}/markets", "crypto markets",
+    default_params={"closed": "false", "limit": 100}
+)
+_fetch_event = make_fetcher(
+    f"{config.GAMMA_API_BASE}/events/{{}}", "event {0} markets", list_result=False
+)
+
+def market_token_ids(market: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    The market's (YES, NO) CLOB token IDs, None for any that is missing
+    Parsed once and memoized on the market dict - market lists are TTL-cached,
+    so later scans of the same market skip the validation
+    """
+    tokens = market.get("_token_ids")
+    if tokens is None:
+        clob_token_ids = market.get("clobTokenIds")
+        if not isinstance(clob_token_ids, list):
+            clob_token_ids = []
+        yes_token, no_token = (clob_token_ids + [None, None])[:2]
+        tokens = market["_token_ids"] = (
+            yes_token if yes_token and isinstance(yes_token, str) else None,
+            no_token if no_token and isinstance(no_token, str) else None
+        )
+    return tokens
+
+@ttl_cache(config.MARKETS_CACHE_TTL)
 async def fetch_negrisk_events() -> List[Dict[str, Any]]:
     """
     Fetch all active NegRisk events from Gamma API
     Returns list of events with their market conditions
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            response = await client.get(
-                f"{config.GAMMA_API_BASE}/events",
-                params={"negRisk": "true", "closed": "false"},
-                timeout=10.0
-            )
-            response.raise_for_status()
-            events = response.json()
-            tui_print(f"✓ Fetched {len(events) if isinstance(events, list) else 0} NegRisk events")
-            return events if isinstance(events, list) else []
-        except httpx.HTTPStatusError as e:
-            tui_print(f"❌ HTTP {e.response.status_code} fetching NegRisk events")
-            tui_print(f"   Response: {e.response.text[:200]}")
-            return []
-        except Exception as e:
-            tui_print(f"❌ Error fetching NegRisk events: {type(e).__name__}: {e}")
-            return []
+    events = await _fetch_negrisk_events()
+    tui_print(f"✓ Fetched {len(events)} NegRisk events")
+    return events
 
+@ttl_cache(config.RESOLVED_MARKET_CACHE_TTL, cache_if=lambda market: bool(market.get("resolved")))
+@singleflight
 async def fetch_market_details(market_id: str) -> Optional[Dict[str, Any]]:
     """
     Fetch detailed information about a specific market
     Includes resolution status and winning outcome
     Supports both Market ID and Condition ID (0x...)
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            # Check if this is a Condition ID (starts with 0x)
-            if market_id.startswith("0x"):
-                # Use query parameter for Condition ID
-                response = await client.get(
-                    f"{config.GAMMA_API_BASE}/markets",
-                    params={"conditionId": market_id},
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                # API returns a list for search queries, take the first result
-                return data[0] if isinstance(data, list) and len(data) > 0 else None
-            else:
-                # Use path parameter for Market ID
-                response = await client.get(
-                    f"{config.GAMMA_API_BASE}/markets/{market_id}",
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                return response.json()
-                
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                tui_print(f"⚠️  Market not found: {market_id}")
-                return None
-            tui_print(f"❌ HTTP {e.response.status_code} fetching market {market_id}")
-            return None
-        except Exception as e:
-            tui_print(f"Error fetching market {market_id}: {e}")
-            return None
+    # Check if this is a Condition ID (starts with 0x)
+    if market_id.startswith("0x"):
+        # Use query parameter for Condition ID
+        # API returns a list for search queries, take the first result
+        data = await _fetch_markets_by_condition(conditionId=market_id)
+        return data[0] if data else None
+    
+    # Use path parameter for Market ID
+    return await _fetch_market_by_id(market_id)
+
+async def fetch_market_details_batch(market_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch details for many markets, keyed by the id they were requested with
+    Market IDs go out in chunks as one multi-id query (?id=a&id=b...);
+    Condition IDs and anything the batch query didn't return fall back to
+    bounded concurrent fetch_market_details calls
+    """
+    unique_ids = list(dict.fromkeys(market_ids))
+    details: Dict[str, Dict[str, Any]] = {}
+    
+    plain_ids = [market_id for market_id in unique_ids if not market_id.startswith("0x")]
+    chunk_size = config.GAMMA_BATCH_MAX_IDS
+    chunks = [plain_ids[i:i + chunk_size] for i in range(0, len(plain_ids), chunk_size)]
+    for markets in await gather_limited(
+        (_fetch_markets_by_ids(id=chunk) for chunk in chunks),
+        config.API_CONCURRENCY_LIMIT
+    ):
+        for market in markets:
+            details[str(market.get("id"))] = market
+    
+    missing = [market_id for market_id in unique_ids if market_id not in details]
+    results = await gather_limited(
+        (fetch_market_details(market_id) for market_id in missing),
+        config.API_CONCURRENCY_LIMIT
+    )
+    for market_id, market in zip(missing, results):
+        if market:
+            details[market_id] = market
+    
+    return details
+
+async def _get_crypto_tag_id() -> Optional[str]:
+    """
+    Resolve the Gamma tag id for crypto markets (cached after first success)
+    Returns None if the tag can't be resolved
+    """
+    global _crypto_tag_id
+    if _crypto_tag_id is not None:
+        return _crypto_tag_id
+    
+    tag = await _fetch_tag_by_slug(config.CRYPTO_TAG_SLUG)
+    tag_id = tag.get("id") if isinstance(tag, dict) else None
+    if tag_id is None:
+        tui_print("⚠️  Could not resolve crypto tag id, filtering client-side only")
+        return None
+    
+    _crypto_tag_id = str(tag_id)
+    return _crypto_tag_id
 
+@ttl_cache(config.MARKETS_CACHE_TTL)
 async def fetch_active_crypto_markets() -> List[Dict[str, Any]]:
     """
     Fetch active crypto markets (for bond trading and temporal arbitrage)
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            # Correct parameters: closed=false for active markets
-            # Note: filtering by crypto tag may need to be done client-side
-            response = await client.get(
-                f"{config.GAMMA_API_BASE}/markets",
-                params={
-                    "closed": "false",
-                    "limit": 100
-                },
-                timeout=10.0
-            )
-            response.raise_for_status()
-            
-            markets = response.json()
-            
-            # Filter for crypto markets client-side if needed
-            # (check if market question/title contains crypto terms)
-            crypto_markets = []
-            for market in markets:
-                question = market.get("question", "").lower()
-                if any(term in question for term in ["btc", "bitcoin", "eth", "ethereum", "crypto", "xrp"]):
-                    crypto_markets.append(market)
-            
-            tui_print(f"✓ Fetched {len(crypto_markets)} crypto markets (from {len(markets)} total)")
-            return crypto_markets
-            
-        except httpx.HTTPStatusError as e:
-            tui_print(f"❌ HTTP {e.response.status_code} fetching crypto markets")
-            tui_print(f"   Response: {e.response.text[:200]}")
-            return []
-        except Exception as e:
-            tui_print(f"❌ Error fetching crypto markets: {type(e).__name__}: {e}")
-            return []
+    # Filter by crypto tag server-side when the tag id is known
+    tag_id = await _get_crypto_tag_id()
+    markets = await (_fetch_open_markets(tag_id=tag_id) if tag_id else _fetch_open_markets())
+    
+    # Residual client-side filter (tag may be missing or too broad)
+    # (check if market question/title contains crypto terms)
+    crypto_markets = [
+        market for market in markets
+        if _CRYPTO_RE.search(market.get("question", ""))
+    ]
+    
+    tui_print(f"✓ Fetched {len(crypto_markets)} crypto markets (from {len(markets)} total)")
+    return crypto_markets
 
+@singleflight
 async def fetch_event_markets(event_id: str) -> List[Dict[str, Any]]:
     """
     Fetch all markets for a specific event (used for NegRisk arbitrage)
     """
-    async with httpx.AsyncClient(verify=False, http2=False) as client:
-        try:
-            response = await client.get(
-                f"{config.GAMMA_API_BASE}/events/{event_id}",
-                timeout=10.0
-            )
-            response.raise_for_status()
-            event_data = response.json()
-            return event_data.get("markets", [])
-        except Exception as e:
-            tui_print(f"Error fetching event {event_id} markets: {e}")
-            return []
+    event_data = await _fetch_event(event_id)
+    return event_data.get("markets", []) if isinstance(event_data, dict) else []
@@ -3,62 +3,108 @@ Price feeds API client
 Fetches BTC prices from Binance and Coinbase for temporal arbitrage and indicators
 """
 
+import asyncio
 import httpx
+import orjson
+from aiolimiter import AsyncLimiter
 from typing import Optional, Dict, Any, List
 import config
-from tui.logger import tui_print
+from apis._client import get_client
+from tui.logger_async import tui_print_nowait
 import time
 
 # Simple cache to prevent rate limiting
 _btc_price_cache = {"price": None, "timestamp": 0}
-_CACHE_DURATION = 30  # seconds
+_CACHE_DURATION = 60  # seconds (CoinGecko free tier allows 10 req/min)
+
+# Single-flight guard so concurrent callers never fetch the same price twice
+_btc_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+
+# Per-host token buckets so bursts never exceed the free-tier request caps
+COINGECKO_LIMIT = AsyncLimiter(config.COINGECKO_MAX_REQUESTS_PER_MIN, 60)
+BLOCKCHAIN_INFO_LIMIT = AsyncLimiter(config.BLOCKCHAIN_INFO_MAX_REQUESTS_PER_MIN, 60)
 
 # ============================================================================
 # BINANCE API (Primary)
 # ============================================================================
 
-async def fetch_binance_btc_price() -> Optional[float]:
+def _cached_btc_price_age() -> float:
+    """Seconds since the cached BTC price was fetched (inf if nothing cached)"""
+    if not _btc_price_cache["price"]:
+        return float("inf")
+    return time.time() - _btc_price_cache["timestamp"]
+
+async def _refresh_coingecko_price() -> Optional[float]:
     """
-    Fetch current BTC/USD price from CoinGecko (replacing Binance due to ISP blocking)
-    Returns price as float or None if error
-    Uses 30-second cache to prevent rate limiting
+    Fetch BTC/USD from CoinGecko and update the cache
+    Must be called with _btc_lock held
+    Returns the new price, or the cached one on error
     """
-    global _btc_price_cache
-    
-    # Check cache
-    current_time = time.time()
-    if _btc_price_cache["price"] and (current_time - _btc_price_cache["timestamp"]) < _CACHE_DURATION:
+    # Another caller may have refreshed while we waited for the lock
+    if _cached_btc_price_age() < _CACHE_DURATION:
         return _btc_price_cache["price"]
     
-    async with httpx.AsyncClient(verify=False, http2=False, follow_redirects=True) as client:
-        try:
+    client = get_client()
+    try:
+        async with COINGECKO_LIMIT:
             response = await client.get(
                 "https://api.coingecko.com/api/v3/simple/price",
                 params={"ids": "bitcoin", "vs_currencies": "usd"},
-                timeout=10.0,
+                timeout=config.BTC_PRICE_SOURCE_TIMEOUT,
+                follow_redirects=True,
                 headers={"User-Agent": "Mozilla/5.0"}
             )
-            response.raise_for_status()
-            data = response.json()
-            price = float(data.get("bitcoin", {}).get("usd", 0))
-            
-            # Update cache
-            _btc_price_cache["price"] = price
-            _btc_price_cache["timestamp"] = current_time
-            
-            return price
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 429:
-                tui_print(f"⚠️  CoinGecko rate limit hit - using cached price if available")
-                return _btc_price_cache.get("price")
-            tui_print(f"Error fetching CoinGecko BTC price (HTTP {e.response.status_code}): {e.response.text[:200]}")
-            return _btc_price_cache.get("price")  # Return cached price on error
-        except ValueError as e:
-            tui_print(f"Error parsing CoinGecko BTC price response (invalid JSON): {e}")
-            return _btc_price_cache.get("price")
-        except Exception as e:
-            tui_print(f"Error fetching CoinGecko BTC price: {e}")
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        price = float(data.get("bitcoin", {}).get("usd", 0))
+        
+        # Update cache
+        _btc_price_cache["price"] = price
+        _btc_price_cache["timestamp"] = time.time()
+        
+        return price
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 429:
+            tui_print_nowait(f"⚠️  CoinGecko rate limit hit - using cached price if available")
             return _btc_price_cache.get("price")
+        tui_print_nowait(f"Error fetching CoinGecko BTC price (HTTP {e.response.status_code}): {e.response.text[:200]}")
+        return _btc_price_cache.get("price")  # Return cached price on error
+    except ValueError as e:
+        tui_print_nowait(f"Error parsing CoinGecko BTC price response (invalid JSON): {e}")
+        return _btc_price_cache.get("price")
+    except Exception as e:
+        tui_print_nowait(f"Error fetching CoinGecko BTC price: {e}")
+        return _btc_price_cache.get("price")
+
+async def _background_refresh() -> Optional[float]:
+    """Refresh the cached price as a task that outlives the caller that started it"""
+    async with _btc_lock:
+        return await _refresh_coingecko_price()
+
+async def fetch_binance_btc_price() -> Optional[float]:
+    """
+    Fetch current BTC/USD price from CoinGecko (replacing Binance due to ISP blocking)
+    Returns price as float or None if error
+    Uses a 60-second cache with stale-while-revalidate:
+    - fresh (< 60s): cached price
+    - stale (< 120s): cached price, refresh kicked off in the background
+    - older/missing: fetch now (one request shared by all concurrent callers)
+    """
+    global _refresh_task
+    
+    age = _cached_btc_price_age()
+    if age < _CACHE_DURATION:
+        return _btc_price_cache["price"]
+    
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_background_refresh())
+    if age < 2 * _CACHE_DURATION:
+        return _btc_price_cache["price"]
+    
+    # Shielded: a caller cancelled after losing the fetch_btc_price race
+    # must not abort the cache fill (or waste the rate-limit token)
+    return await asyncio.shield(_refresh_task)
 
 async def fetch_binance_btc_candles(
     interval: str = "1h",
@@ -83,25 +129,27 @@ async def fetch_coinbase_btc_price() -> Optional[float]:
     Fetch current BTC/USD price from Blockchain.info (replacing Coinbase due to ISP blocking)
     Returns price as float or None if error
     """
-    async with httpx.AsyncClient(verify=False, http2=False, follow_redirects=True) as client:
-        try:
+    client = get_client()
+    try:
+        async with BLOCKCHAIN_INFO_LIMIT:
             response = await client.get(
                 "https://blockchain.info/ticker",
-                timeout=10.0,
+                timeout=config.BTC_PRICE_SOURCE_TIMEOUT,
+                follow_redirects=True,
                 headers={"User-Agent": "Mozilla/5.0"}
             )
-            response.raise_for_status()
-            data = response.json()
-            return float(data.get("USD", {}).get("last", 0))
-        except httpx.HTTPStatusError as e:
-            tui_print(f"Error fetching Blockchain.info BTC price (HTTP {e.response.status_code}): {e.response.text[:200]}")
-            return None
-        except ValueError as e:
-            tui_print(f"Error parsing Blockchain.info BTC price response (invalid JSON): {e}")
-            return None
-        except Exception as e:
-            tui_print(f"Error fetching Blockchain.info BTC price: {e}")
-            return None
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        return float(data.get("USD", {}).get("last", 0))
+    except httpx.HTTPStatusError as e:
+        tui_print_nowait(f"Error fetching Blockchain.info BTC price (HTTP {e.response.status_code}): {e.response.text[:200]}")
+        return None
+    except ValueError as e:
+        tui_print_nowait(f"Error parsing Blockchain.info BTC price response (invalid JSON): {e}")
+        return None
+    except Exception as e:
+        tui_print_nowait(f"Error fetching Blockchain.info BTC price: {e}")
+        return None
 
 # ============================================================================
 # UNIFIED PRICE FETCHER
@@ -110,14 +158,24 @@ async def fetch_coinbase_btc_price() -> Optional[float]:
 async def fetch_btc_price() -> Optional[float]:
     """
     Fetch BTC price with fallback
-    Tries Binance first, falls back to Coinbase if Binance fails
+    Races Binance and Coinbase (hedged request) and returns the first valid price,
+    a hung source no longer delays the other
     """
-    price = await fetch_binance_btc_price()
-    if price:
-        return price
-    
-    # Fallback to Coinbase
-    price = await fetch_coinbase_btc_price()
+    pending = {
+        asyncio.create_task(fetch_binance_btc_price()),
+        asyncio.create_task(fetch_coinbase_btc_price())
+    }
+    price = None
+    try:
+        while pending and not price:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not price and not task.cancelled() and task.exception() is None:
+                    price = task.result()
+    finally:
+        # Cancel the loser
+        for task in pending:
+            task.cancel()
     return price
 
 async def fetch_btc_price_both() -> Dict[str, Optional[float]]:
@@ -126,8 +184,10 @@ async def fetch_btc_price_both() -> Dict[str, Optional[float]]:
     Returns dict with 'binance' and 'coinbase' keys
     NOTE: Using CoinGecko and Blockchain.info instead of Binance/Coinbase (ISP blocking)
     """
-    coingecko_price = await fetch_binance_btc_price()  # Actually CoinGecko now
-    blockchain_price = await fetch_coinbase_btc_price()  # Actually Blockchain.info now
+    coingecko_price, blockchain_price = await asyncio.gather(
+        fetch_binance_btc_price(),  # Actually CoinGecko now
+        fetch_coinbase_btc_price()  # Actually Blockchain.info now
+    )
     
     return {
         "binance": coingecko_price,
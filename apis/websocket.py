@@ -4,9 +4,11 @@ Handles real-time orderbook updates for arbitrage detection
 """
 
 import websockets
-import json
+import orjson
 import asyncio
-from typing import Callable, Optional
+import inspect
+from collections import deque
+from typing import Callable, List, Optional
 import config
 from tui.logger import tui_print
 
@@ -17,21 +19,79 @@ class PolymarketWebSocket:
         self.ws = None
         self.subscriptions = {}
         self.running = False
+        self._inbox = deque()
+        self._ready = asyncio.Event()
+        self._backoff = config.WEBSOCKET_RECONNECT_MIN_DELAY
+        self.out_queue = asyncio.Queue(maxsize=config.WEBSOCKET_SEND_QUEUE_SIZE)
+        self._writer_task = None
+        self._recv_kwargs = {}
+    
+    async def _open(self):
+        """Open the socket (raises on failure) and reset the reconnect backoff"""
+        # Orderbook frames are small JSON - deflate costs more CPU than it saves
+        # Pings detect a silently dead connection before the next recv would
+        self.ws = await websockets.connect(
+            config.WEBSOCKET_URL,
+            compression=None,
+            max_size=config.WEBSOCKET_MAX_MESSAGE_SIZE,
+            write_limit=config.WEBSOCKET_WRITE_LIMIT,
+            ping_interval=config.WEBSOCKET_PING_INTERVAL,
+            ping_timeout=config.WEBSOCKET_PING_TIMEOUT
+        )
+        self._backoff = config.WEBSOCKET_RECONNECT_MIN_DELAY
+        # Newer clients can hand back raw bytes, skipping UTF-8 decoding (orjson takes bytes)
+        recv_params = inspect.signature(self.ws.recv).parameters
+        self._recv_kwargs = {"decode": False} if "decode" in recv_params else {}
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer())
+        tui_print("WebSocket connected")
     
     async def connect(self):
         """Establish WebSocket connection"""
         try:
-            self.ws = await websockets.connect(config.WEBSOCKET_URL)
+            await self._open()
             self.running = True
-            tui_print("WebSocket connected")
         except Exception as e:
             tui_print(f"WebSocket connection error: {e}")
             self.running = False
     
+    async def _reconnect(self):
+        """Reconnect with exponential backoff until connected or closed"""
+        self.ws = None
+        while self.running:
+            delay = self._backoff
+            self._backoff = min(delay * 2, config.WEBSOCKET_RECONNECT_MAX_DELAY)
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+                return
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                tui_print(f"WebSocket reconnect failed ({e}), retrying in {self._backoff}s")
+    
+    async def _send(self, message: dict):
+        """Queue a message for the writer task"""
+        # Decoded so it still goes out as a text frame
+        await self.out_queue.put(orjson.dumps(message).decode())
+    
+    async def _writer(self):
+        """Send queued messages, draining whatever is already queued per wake"""
+        queue = self.out_queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < config.WEBSOCKET_SEND_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                for message in batch:
+                    await self.ws.send(message)
+            except Exception as e:
+                tui_print(f"WebSocket send error ({len(batch)} messages dropped): {e}")
+    
     async def subscribe_market(self, market_id: str, callback: Callable):
         """
         Subscribe to orderbook updates for a market
-        callback: async function to handle updates
+        callback: async function called with a LIST of updates for the market
+                  (all frames received since the last dispatch, oldest first)
+                  - not one dict per frame; exceptions it raises are logged
         """
         if not self.ws:
             await self.connect()
@@ -43,12 +103,35 @@ class PolymarketWebSocket:
         }
         
         try:
-            await self.ws.send(json.dumps(subscribe_msg))
+            await self._send(subscribe_msg)
             self.subscriptions[market_id] = callback
             tui_print(f"Subscribed to market {market_id}")
         except Exception as e:
             tui_print(f"Error subscribing to {market_id}: {e}")
     
+    async def subscribe_markets(self, market_ids: List[str], callback: Callable):
+        """
+        Subscribe to orderbook updates for many markets in one frame
+        callback: same contract as subscribe_market, shared by all markets
+        """
+        if not market_ids:
+            return
+        if not self.ws:
+            await self.connect()
+        
+        subscribe_msg = {
+            "type": "subscribe",
+            "markets": market_ids,
+            "channel": "orderbook"
+        }
+        
+        try:
+            await self._send(subscribe_msg)
+            self.subscriptions.update(dict.fromkeys(market_ids, callback))
+            tui_print(f"Subscribed to {len(market_ids)} markets")
+        except Exception as e:
+            tui_print(f"Error subscribing to {len(market_ids)} markets: {e}")
+    
     async def unsubscribe_market(self, market_id: str):
         """Unsubscribe from a market"""
         if not self.ws:
@@ -60,46 +143,90 @@ class PolymarketWebSocket:
         }
         
         try:
-            await self.ws.send(json.dumps(unsubscribe_msg))
-            if market_id in self.subscriptions:
-                del self.subscriptions[market_id]
+            await self._send(unsubscribe_msg)
+            self.subscriptions.pop(market_id, None)
             tui_print(f"Unsubscribed from market {market_id}")
         except Exception as e:
             tui_print(f"Error unsubscribing from {market_id}: {e}")
     
+    async def _read_frames(self):
+        """Push raw frames into the inbox until the connection drops"""
+        recv = self.ws.recv
+        recv_kwargs = self._recv_kwargs
+        try:
+            while True:
+                self._inbox.append(await recv(**recv_kwargs))
+                self._ready.set()
+        finally:
+            # Wake listen() so it notices the reader has stopped
+            self._ready.set()
+    
+    async def _dispatch(self):
+        """Parse every buffered frame, group by market and run callbacks once per market"""
+        grouped = {}
+        while self._inbox:
+            # A bad frame is skipped without losing the rest of the batch
+            try:
+                data = orjson.loads(self._inbox.popleft())
+                market_id = data.get("market")
+            except (orjson.JSONDecodeError, AttributeError) as e:
+                tui_print(f"WebSocket error: skipping malformed frame ({e})")
+                continue
+            if market_id:
+                grouped.setdefault(market_id, []).append(data)
+        
+        subscriptions = self.subscriptions
+        markets = []
+        calls = []
+        for market_id, batch in grouped.items():
+            callback = subscriptions.get(market_id)
+            if callback is not None:
+                markets.append(market_id)
+                calls.append(callback(batch))
+        # One failing subscriber must not cancel the others
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for market_id, result in zip(markets, results):
+            if isinstance(result, Exception):
+                tui_print(f"WebSocket callback error for {market_id}: {result}")
+    
     async def listen(self):
         """
         Listen for WebSocket messages and route to callbacks
         This should run in a background task
+        
+        A reader task buffers frames as they arrive; each wake drains
+        the whole buffer so bursts are handled in one dispatch
         """
         while self.running:
+            reader = None
             try:
                 if not self.ws:
-                    await self.connect()
-                    await asyncio.sleep(5)
+                    await self._reconnect()
                     continue
                 
-                message = await self.ws.recv()
-                data = json.loads(message)
-                
-                # Route message to appropriate callback
-                market_id = data.get("market")
-                if market_id and market_id in self.subscriptions:
-                    callback = self.subscriptions[market_id]
-                    await callback(data)
+                reader = asyncio.create_task(self._read_frames())
+                while not reader.done():
+                    await self._ready.wait()
+                    self._ready.clear()
+                    await self._dispatch()
+                reader.result()  # re-raise why the reader stopped
                 
-            except websockets.exceptions.ConnectionClosed:
-                tui_print("WebSocket connection closed, reconnecting...")
-                self.running = False
-                await asyncio.sleep(5)
-                await self.connect()
+            except (websockets.exceptions.ConnectionClosed, OSError) as e:
+                tui_print(f"WebSocket connection lost ({e}), reconnecting...")
+                await self._reconnect()
             except Exception as e:
                 tui_print(f"WebSocket error: {e}")
                 await asyncio.sleep(1)
+            finally:
+                if reader is not None:
+                    reader.cancel()
     
     async def close(self):
         """Close WebSocket connection"""
         self.running = False
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
         if self.ws:
             await self.ws.close()
             tui_print("WebSocket closed")
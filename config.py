@@ -13,10 +13,84 @@ CLOB_API_BASE = "https://clob.polymarket.com"
 DATA_API_BASE = "https://data-api.polymarket.com"
 WEBSOCKET_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/"
 
+# WebSocket frame limits (bytes)
+WEBSOCKET_MAX_MESSAGE_SIZE = 2 ** 21
+WEBSOCKET_WRITE_LIMIT = 2 ** 20
+
+# WebSocket heartbeat and reconnect backoff (seconds)
+WEBSOCKET_PING_INTERVAL = 20
+WEBSOCKET_PING_TIMEOUT = 10
+WEBSOCKET_RECONNECT_MIN_DELAY = 1
+WEBSOCKET_RECONNECT_MAX_DELAY = 30
+
+# Outgoing WebSocket queue (messages) and max sends per writer wake
+WEBSOCKET_SEND_QUEUE_SIZE = 1024
+WEBSOCKET_SEND_BATCH_SIZE = 128
+
+# Hosts resolved at startup so the first request skips DNS
+PREWARM_URLS = [
+    GAMMA_API_BASE,
+    CLOB_API_BASE,
+    DATA_API_BASE,
+    "https://api.coingecko.com",
+    "https://blockchain.info",
+]
+
+# Hosts that also get a HEAD request at startup so a pooled (TLS) connection is ready
+# Rate-limited third-party price feeds are only DNS-warmed
+PREWARM_CONNECT_URLS = [
+    GAMMA_API_BASE,
+    CLOB_API_BASE,
+    DATA_API_BASE,
+]
+
+# Gamma tag used to filter crypto markets server-side
+CRYPTO_TAG_SLUG = "crypto"
+
+# Keywords for the residual client-side crypto market filter
+CRYPTO_KEYWORDS = ["btc", "bitcoin", "eth", "ethereum", "crypto", "xrp"]
+
 # Exchange APIs for BTC price (all free, no key required)
 BINANCE_API_BASE = "https://api.binance.com"
 COINBASE_API_BASE = "https://api.coinbase.com"
 
+# Client-side rate limits for the BTC price sources (requests per minute)
+COINGECKO_MAX_REQUESTS_PER_MIN = 10   # CoinGecko free tier cap
+BLOCKCHAIN_INFO_MAX_REQUESTS_PER_MIN = 30
+
+# Per-source timeout (seconds) - short because the two sources are raced
+BTC_PRICE_SOURCE_TIMEOUT = 3.0
+
+# ============================================================================
+# HTTP CLIENT
+# ============================================================================
+
+# Shared connection pool used by every API module
+HTTP_VERIFY_TLS = True                # Verify certificates with a shared SSL context
+HTTP2_ENABLED = True                  # Multiplex concurrent requests over one connection (needs h2)
+HTTP_TIMEOUT = 10.0                   # seconds
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+HTTP_KEEPALIVE_EXPIRY = 30.0          # seconds (longer than typical server idle timeout)
+
+# Single-token price lookups arriving within this window share one /prices request
+PRICE_BATCH_WINDOW_MS = 10
+PRICE_BATCH_MAX_TOKENS = 100          # Token IDs per /prices request
+
+# Max in-flight requests for any API fan-out
+API_CONCURRENCY_LIMIT = 16
+
+# Market ids per Gamma multi-id /markets query
+GAMMA_BATCH_MAX_IDS = 50
+
+# Response cache lifetimes (seconds) for slow-changing endpoints
+LEADERBOARD_CACHE_TTL = 60
+MARKETS_CACHE_TTL = 30
+RESOLVED_MARKET_CACHE_TTL = 3600      # Resolved markets never change
+WHALE_MARKET_CACHE_TTL = 60           # Market details looked up per whale trade
+WHALE_MARKET_CACHE_MAX_SIZE = 2048
+WHALE_NON_CRYPTO_CACHE_TTL = 3600     # Non-crypto verdicts (a question never turns crypto)
+
 # ============================================================================
 # STRATEGY 1: NEGRISK REBALANCING ARBITRAGE
 # ============================================================================
@@ -48,6 +122,9 @@ BOND_MAX_POSITION_PCT = 0.05      # Never exceed 5%
 # Minimum liquidity required (USD) to execute bond trade
 BOND_MIN_LIQUIDITY = 10.0
 
+# Max concurrent price/liquidity probes per bond scan
+BOND_MAX_CONCURRENCY = 25
+
 # ============================================================================
 # STRATEGY 3: WHALE COPY TRADING
 # ============================================================================
@@ -58,6 +135,12 @@ WHALE_DISCOVERY_INTERVAL = 1800  # 30 minutes
 # How often to poll whale activity (seconds)
 WHALE_MONITOR_INTERVAL = 12  # 12 seconds
 
+# Max concurrent wallet trade fetches per monitor cycle
+WHALE_MONITOR_CONCURRENCY = 10
+
+# Whale trades remembered in-process so repeat polls skip the DB duplicate check
+WHALE_SEEN_TRADES_MAX = 10000
+
 # Whale vetting criteria
 WHALE_MIN_PROFIT = 50.0        # $50 profit in last 7 days (realistic for weekly leaderboard)
 WHALE_MIN_TRADES = 3           # At least 3 trades (estimated from volume)
@@ -114,6 +197,9 @@ TEMPORAL_MAX_POSITION_PCT = 0.03      # 3%
 # Resolution engine check interval (seconds)
 RESOLUTION_CHECK_INTERVAL = 5
 
+# Start checking a trade this many seconds before its market's resolution time
+RESOLUTION_TIME_SLACK = 30
+
 # Paper fund validation
 PAPER_FUND_MIN = 10.0          # Minimum $10
 PAPER_FUND_MAX = 1000000.0     # Maximum $1M
@@ -152,11 +238,52 @@ BTC_CANDLE_LIMIT = 20
 # Dashboard refresh rate (seconds)
 DASHBOARD_REFRESH_INTERVAL = 1
 
+# Activity feed flush interval (seconds) - messages are written in one batch per tick
+LOG_FLUSH_INTERVAL = 0.05
+
 # Activity feed max items
 ACTIVITY_FEED_MAX_ITEMS = 100
 
+# Deferred log queue size (hot error paths drop messages beyond this)
+LOG_QUEUE_MAX_SIZE = 1000
+
+# Include tracebacks in API error logs (walks the stack on every error)
+DEBUG_TRACEBACKS = False
+
 # ============================================================================
 # DATABASE
 # ============================================================================
 
 DATABASE_PATH = "polymarket_bot.db"
+
+# Per-connection SQLite tuning (WAL/synchronous are set alongside these)
+DATABASE_MMAP_SIZE = 256 * 1024 * 1024  # bytes of memory-mapped I/O
+DATABASE_CACHE_SIZE_KB = 64 * 1024  # page cache size
+DATABASE_STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+DATABASE_COMMIT_WINDOW = 0.05  # seconds - writes in this window share one commit
+
+# ============================================================================
+# TYPED SNAPSHOT
+# ============================================================================
+
+# Frozen, slotted view of every setting above for hot loops:
+#   from config import CFG; CFG.NEGRISK_BUFFER
+# The module-level names stay the source of truth (built once at import)
+from dataclasses import make_dataclass as _make_dataclass
+from typing import Final as _Final
+
+def _build_cfg():
+    settings = {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in globals().items()
+        if name.isupper()
+    }
+    config_cls = _make_dataclass(
+        "_Config",
+        [(name, _Final[type(value)]) for name, value in settings.items()],
+        frozen=True,
+        slots=True
+    )
+    return config_cls(**settings)
+
+CFG: _Final = _build_cfg()
@@ -3,10 +3,146 @@ Database layer for Polymarket Multi-Strategy Trading Bot
 SQLite schema and async operations using aiosqlite
 """
 
+import asyncio
+import sqlite3
+import time
+from collections import namedtuple
 import aiosqlite
-from datetime import datetime
-from typing import Optional, Dict, List, Any
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Any, Tuple
 import config
+from tui.logger import tui_print
+
+# ============================================================================
+# ROW TYPES
+# ============================================================================
+
+# Reads return lightweight namedtuples instead of dicts
+# Queries list the columns explicitly - migrated databases have a different column order
+PaperFundRow = namedtuple("PaperFundRow", [
+    "id", "starting_fund", "current_balance", "total_profit", "total_loss",
+    "total_fees_paid", "total_trades", "winning_trades", "losing_trades",
+    "created_at", "last_updated_at"
+])
+
+PaperTradeRow = namedtuple("PaperTradeRow", [
+    "id", "strategy_id", "market_id", "market_name", "asset", "side", "price",
+    "shares", "cost", "fee", "status", "outcome", "payout", "profit_or_loss",
+    "arb_id", "resolution_time", "created_at", "resolved_at"
+])
+
+WhaleRow = namedtuple("WhaleRow", [
+    "wallet_address", "profit_7d", "total_trades", "win_rate", "last_trade_at",
+    "is_active", "cluster_id", "discovered_at", "last_checked_at"
+])
+
+DailyPnlRow = namedtuple("DailyPnlRow", [
+    "date", "negrisk_arb_pnl", "high_prob_bond_pnl", "whale_copy_pnl",
+    "temporal_arb_pnl", "total_pnl", "total_trades"
+])
+
+# Everything the dashboard's stat widgets show, read in one call
+DashboardSnapshot = namedtuple("DashboardSnapshot", ["fund", "whale_count", "daily"])
+
+# Settlement of one trade, as written by resolve_trades_bulk
+TradeResolution = namedtuple("TradeResolution", [
+    "trade_id", "strategy_id", "outcome", "payout", "profit_or_loss", "fee"
+])
+
+_PAPER_FUND_COLUMNS = ", ".join(PaperFundRow._fields)
+_PAPER_TRADE_COLUMNS = ", ".join(PaperTradeRow._fields)
+_WHALE_COLUMNS = ", ".join(WhaleRow._fields)
+
+# ============================================================================
+# CONNECTION
+# ============================================================================
+
+# Shared connection for the process lifetime (opened lazily by get_db)
+_db: Optional[aiosqlite.Connection] = None
+_db_lock = asyncio.Lock()
+
+async def get_db() -> aiosqlite.Connection:
+    """Get the shared database connection, opening it on first use"""
+    global _db
+    if _db is not None:
+        return _db
+    
+    async with _db_lock:
+        if _db is None:
+            db = await aiosqlite.connect(
+                config.DATABASE_PATH,
+                cached_statements=config.DATABASE_STATEMENT_CACHE_SIZE
+            )
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute("PRAGMA synchronous=NORMAL")
+            await db.execute("PRAGMA temp_store=MEMORY")
+            await db.execute(f"PRAGMA mmap_size={int(config.DATABASE_MMAP_SIZE)}")
+            await db.execute(f"PRAGMA cache_size=-{int(config.DATABASE_CACHE_SIZE_KB)}")
+            _db = db
+    return _db
+
+async def close_db() -> None:
+    """Close the shared database connection (call on shutdown)"""
+    global _db
+    if _db is not None:
+        await flush()
+        await _db.close()
+        _db = None
+
+# Group commit: writes inside one window share a single commit (one fsync)
+_commit_handle: Optional[asyncio.TimerHandle] = None
+_commit_task: Optional[asyncio.Task] = None
+
+async def _commit_later() -> None:
+    """Schedule a commit at the end of the current group-commit window"""
+    global _commit_handle
+    if _commit_handle is None:
+        loop = asyncio.get_running_loop()
+        _commit_handle = loop.call_later(config.DATABASE_COMMIT_WINDOW, _start_commit)
+
+def _start_commit() -> None:
+    global _commit_handle, _commit_task
+    _commit_handle = None
+    if _db is None:
+        _commit_task = None
+        return
+    _commit_task = asyncio.ensure_future(_db.commit())
+    _commit_task.add_done_callback(_commit_done)
+
+def _commit_done(task: asyncio.Task) -> None:
+    """Log a failed group commit and retry it next window (the writes stay pending)"""
+    global _commit_handle
+    if task.cancelled() or task.exception() is None:
+        return
+    tui_print(f"❌ Database commit error, retrying: {task.exception()}")
+    if _commit_handle is None and _db is not None:
+        loop = asyncio.get_running_loop()
+        _commit_handle = loop.call_later(config.DATABASE_COMMIT_WINDOW, _start_commit)
+
+async def flush() -> None:
+    """Commit any pending writes now instead of waiting for the window"""
+    global _commit_handle
+    if _commit_handle is not None:
+        _commit_handle.cancel()
+        _commit_handle = None
+    if _commit_task is not None and not _commit_task.done():
+        await _commit_task
+    if _db is not None:
+        await _db.commit()
+
+# Last formatted UTC timestamp and the time it was taken
+_ts_cache = ["", 0.0]
+
+def _now_iso() -> str:
+    """
+    Current UTC time as an ISO-8601 string, reformatted at most once per millisecond
+    Writes in the same sweep share the string instead of each building a datetime
+    """
+    t = time.time()
+    if t - _ts_cache[1] > 0.001:
+        _ts_cache[0] = datetime.utcfromtimestamp(t).isoformat()
+        _ts_cache[1] = t
+    return _ts_cache[0]
 
 # ============================================================================
 # DATABASE INITIALIZATION
@@ -14,179 +150,332 @@ import config
 
 async def init_database():
     """Initialize SQLite database with all required tables"""
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        # Paper fund table (single row)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS paper_fund (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                starting_fund REAL NOT NULL,
-                current_balance REAL NOT NULL,
-                total_profit REAL DEFAULT 0,
-                total_loss REAL DEFAULT 0,
-                total_fees_paid REAL DEFAULT 0,
-                total_trades INTEGER DEFAULT 0,
-                winning_trades INTEGER DEFAULT 0,
-                losing_trades INTEGER DEFAULT 0,
-                created_at TEXT NOT NULL,
-                last_updated_at TEXT NOT NULL
-            )
-        """)
-        
-        # Paper trades table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS paper_trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                strategy_id TEXT NOT NULL,
-                market_id TEXT NOT NULL,
-                market_name TEXT,
-                asset TEXT,
-                side TEXT NOT NULL,
-                price REAL NOT NULL,
-                shares REAL NOT NULL,
-                cost REAL NOT NULL,
-                fee REAL DEFAULT 0,
-                status TEXT DEFAULT 'OPEN',
-                outcome TEXT,
-                payout REAL,
-                profit_or_loss REAL,
-                arb_id TEXT,
-                resolution_time TEXT,
-                created_at TEXT NOT NULL,
-                resolved_at TEXT
-            )
-        """)
-        
-        # Whales table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS whales (
-                wallet_address TEXT PRIMARY KEY,
-                profit_7d REAL,
-                total_trades INTEGER,
-                win_rate REAL,
-                last_trade_at TEXT,
-                is_active INTEGER DEFAULT 1,
-                cluster_id TEXT,
-                discovered_at TEXT NOT NULL,
-                last_checked_at TEXT NOT NULL
-            )
-        """)
-        
-        # Whale clusters table
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS whale_clusters (
-                cluster_id TEXT PRIMARY KEY,
-                wallet_addresses TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Whale trades table (historical tracking)
+    # get_db applies the WAL/synchronous/mmap/cache pragmas on connect
+    db = await get_db()
+    # Paper fund table (single row)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS paper_fund (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            starting_fund REAL NOT NULL,
+            current_balance REAL NOT NULL,
+            total_profit REAL DEFAULT 0,
+            total_loss REAL DEFAULT 0,
+            total_fees_paid REAL DEFAULT 0,
+            total_trades INTEGER DEFAULT 0,
+            winning_trades INTEGER DEFAULT 0,
+            losing_trades INTEGER DEFAULT 0,
+            created_at TEXT NOT NULL,
+            last_updated_at TEXT NOT NULL
+        )
+    """)
+    
+    # Paper trades table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS paper_trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            strategy_id TEXT NOT NULL,
+            market_id TEXT NOT NULL,
+            market_name TEXT,
+            asset TEXT,
+            side TEXT NOT NULL,
+            price REAL NOT NULL,
+            shares REAL NOT NULL,
+            cost REAL NOT NULL,
+            fee REAL DEFAULT 0,
+            status TEXT DEFAULT 'OPEN',
+            outcome TEXT,
+            payout REAL,
+            profit_or_loss REAL,
+            arb_id TEXT,
+            resolution_time TEXT,
+            created_at TEXT NOT NULL,
+            resolved_at TEXT
+        )
+    """)
+    
+    # Whales table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS whales (
+            wallet_address TEXT PRIMARY KEY,
+            profit_7d REAL,
+            total_trades INTEGER,
+            win_rate REAL,
+            last_trade_at TEXT,
+            is_active INTEGER DEFAULT 1,
+            cluster_id TEXT,
+            discovered_at TEXT NOT NULL,
+            last_checked_at TEXT NOT NULL
+        )
+    """)
+    
+    # Whale clusters table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS whale_clusters (
+            cluster_id TEXT PRIMARY KEY,
+            wallet_addresses TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    
+    # Whale trades table (historical tracking)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS whale_trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            wallet_address TEXT NOT NULL,
+            market_id TEXT NOT NULL,
+            side TEXT NOT NULL,
+            price REAL NOT NULL,
+            shares REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            FOREIGN KEY (wallet_address) REFERENCES whales(wallet_address)
+        )
+    """)
+    
+    # Signals table
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS signals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            market_id TEXT NOT NULL,
+            side TEXT NOT NULL,
+            whale_count INTEGER NOT NULL,
+            confidence TEXT NOT NULL,
+            price_at_signal REAL NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    
+    # Daily P&L table (legacy wide form, superseded by daily_pnl_v2)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS daily_pnl (
+            date TEXT PRIMARY KEY,
+            negrisk_arb_pnl REAL DEFAULT 0,
+            high_prob_bond_pnl REAL DEFAULT 0,
+            whale_copy_pnl REAL DEFAULT 0,
+            temporal_arb_pnl REAL DEFAULT 0,
+            total_pnl REAL DEFAULT 0,
+            total_trades INTEGER DEFAULT 0
+        )
+    """)
+    
+    # Running spend per day (cost + fee), kept in step with paper_trades inserts
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS daily_spend (
+            date TEXT PRIMARY KEY,
+            gross_spend REAL DEFAULT 0
+        )
+    """)
+    
+    # Daily P&L, long form (one row per date and strategy)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS daily_pnl_v2 (
+            date TEXT NOT NULL,
+            strategy TEXT NOT NULL,
+            pnl REAL DEFAULT 0,
+            trades INTEGER DEFAULT 0,
+            PRIMARY KEY (date, strategy)
+        )
+    """)
+    
+    # One-off upgrades for database files created by older versions
+    await migrate_schema(db)
+    
+    # Indexes for the hot lookups
+    # Whale trade duplicate check (wallet, market, side, recent timestamp)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_wt_dup ON whale_trades(wallet_address, market_id, side, timestamp)"
+    )
+    # Unique whales per side on a market since a given time (covering - index-only)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_wt_market_side ON whale_trades(market_id, timestamp, side, wallet_address)"
+    )
+    # Open trades per strategy and market (partial index - only the small OPEN subset is indexed)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_trades_open_strategy ON paper_trades(strategy_id, market_id) WHERE status = 'OPEN'"
+    )
+    # Recent trades and daily spend
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_trades_created ON paper_trades(created_at DESC)"
+    )
+    
+    await db.commit()
+
+# Stored in PRAGMA user_version - bump when adding a step to migrate_schema
+SCHEMA_VERSION = 5
+
+async def migrate_schema(db: aiosqlite.Connection) -> None:
+    """
+    Bring an older database file up to SCHEMA_VERSION
+    Costs a single PRAGMA read once the file is current
+    """
+    async with db.execute("PRAGMA user_version") as cursor:
+        (version,) = await cursor.fetchone()
+    if version >= SCHEMA_VERSION:
+        return
+    
+    if version < 1:
+        # paper_trades predating the asset/resolution_time columns
+        for column in ("asset TEXT", "resolution_time TEXT"):
+            try:
+                await db.execute(f"ALTER TABLE paper_trades ADD COLUMN {column}")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e).lower():
+                    raise
+    
+    if version < 2:
+        # Backfill the running daily spend from existing trades
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS whale_trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                wallet_address TEXT NOT NULL,
-                market_id TEXT NOT NULL,
-                side TEXT NOT NULL,
-                price REAL NOT NULL,
-                shares REAL NOT NULL,
-                timestamp TEXT NOT NULL,
-                FOREIGN KEY (wallet_address) REFERENCES whales(wallet_address)
-            )
+            INSERT OR IGNORE INTO daily_spend (date, gross_spend)
+            SELECT substr(created_at, 1, 10), SUM(cost + fee)
+            FROM paper_trades
+            GROUP BY substr(created_at, 1, 10)
         """)
-        
-        # Signals table
+        # Carry over per-strategy P&L from the legacy wide table (trade
+        # counts are carried separately by the v5 step)
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS signals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                market_id TEXT NOT NULL,
-                side TEXT NOT NULL,
-                whale_count INTEGER NOT NULL,
-                confidence TEXT NOT NULL,
-                price_at_signal REAL NOT NULL,
-                created_at TEXT NOT NULL
-            )
+            INSERT OR IGNORE INTO daily_pnl_v2 (date, strategy, pnl, trades)
+            SELECT date, 'NEGRISK_ARB', negrisk_arb_pnl, 0 FROM daily_pnl WHERE negrisk_arb_pnl != 0
+            UNION ALL
+            SELECT date, 'HIGH_PROB_BOND', high_prob_bond_pnl, 0 FROM daily_pnl WHERE high_prob_bond_pnl != 0
+            UNION ALL
+            SELECT date, 'WHALE_COPY', whale_copy_pnl, 0 FROM daily_pnl WHERE whale_copy_pnl != 0
+            UNION ALL
+            SELECT date, 'TEMPORAL_ARB', temporal_arb_pnl, 0 FROM daily_pnl WHERE temporal_arb_pnl != 0
         """)
-        
-        # Daily P&L table
+    
+    if version < 3:
+        # Superseded by the covering idx_wt_market_side
+        await db.execute("DROP INDEX IF EXISTS idx_wt_market_ts")
+    
+    if version < 4:
+        # Superseded by the partial idx_trades_open_strategy
+        await db.execute("DROP INDEX IF EXISTS idx_trades_open")
+    
+    if version < 5:
+        # Legacy trade counts, one row per day under a strategy key the
+        # pivot counts trades for but maps to no P&L column - also keeps
+        # days that traded with zero P&L
         await db.execute("""
-            CREATE TABLE IF NOT EXISTS daily_pnl (
-                date TEXT PRIMARY KEY,
-                negrisk_arb_pnl REAL DEFAULT 0,
-                high_prob_bond_pnl REAL DEFAULT 0,
-                whale_copy_pnl REAL DEFAULT 0,
-                temporal_arb_pnl REAL DEFAULT 0,
-                total_pnl REAL DEFAULT 0,
-                total_trades INTEGER DEFAULT 0
-            )
+            INSERT OR IGNORE INTO daily_pnl_v2 (date, strategy, pnl, trades)
+            SELECT date, 'LEGACY', 0, total_trades FROM daily_pnl
         """)
-        
-        await db.commit()
+    
+    await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    await db.commit()
 
 # ============================================================================
 # PAPER FUND OPERATIONS
 # ============================================================================
 
-async def get_paper_fund() -> Optional[Dict[str, Any]]:
-    """Get paper fund data"""
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("SELECT * FROM paper_fund WHERE id = 1") as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+_SELECT_PAPER_FUND = f"SELECT {_PAPER_FUND_COLUMNS} FROM paper_fund WHERE id = 1"
+
+# Last-read fund row and the write version it was read at
+# Writes bump the version; a read racing a write doesn't mark the cache fresh
+_fund_cache: Optional[PaperFundRow] = None
+_fund_cached_version = -1
+_fund_version = 0
+
+async def get_paper_fund() -> Optional[PaperFundRow]:
+    """Get paper fund data (cached until the fund is written)"""
+    global _fund_cache, _fund_cached_version
+    if _fund_cached_version == _fund_version:
+        return _fund_cache
+    
+    version = _fund_version
+    db = await get_db()
+    async with db.execute(_SELECT_PAPER_FUND) as cursor:
+        row = await cursor.fetchone()
+    fund = PaperFundRow._make(row) if row else None
+    if version == _fund_version:
+        _fund_cache = fund
+        _fund_cached_version = version
+    return fund
 
 async def create_paper_fund(starting_fund: float) -> None:
     """Create initial paper fund"""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        await db.execute("""
-            INSERT INTO paper_fund (
-                id, starting_fund, current_balance, created_at, last_updated_at
-            ) VALUES (1, ?, ?, ?, ?)
-        """, (starting_fund, starting_fund, now, now))
-        await db.commit()
-
-async def update_paper_fund_balance(
-    new_balance: float,
+    global _fund_version
+    now = _now_iso()
+    db = await get_db()
+    await db.execute("""
+        INSERT INTO paper_fund (
+            id, starting_fund, current_balance, created_at, last_updated_at
+        ) VALUES (1, ?, ?, ?, ?)
+    """, (starting_fund, starting_fund, now, now))
+    await db.commit()
+    _fund_version += 1
+
+# Relative update - never read-modify-write the balance across an await
+_CREDIT_PAPER_FUND = """
+    UPDATE paper_fund SET
+        current_balance = current_balance + ?,
+        total_profit = total_profit + ?,
+        total_loss = total_loss + ?,
+        total_fees_paid = total_fees_paid + ?,
+        total_trades = total_trades + ?,
+        winning_trades = winning_trades + ?,
+        losing_trades = losing_trades + ?,
+        last_updated_at = ?
+    WHERE id = 1
+"""
+
+async def credit_paper_fund(
+    payout: float,
     profit: float = 0,
     loss: float = 0,
     fee: float = 0,
     is_win: bool = False,
     is_loss: bool = False
 ) -> None:
-    """Update paper fund after trade resolution"""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        await db.execute("""
-            UPDATE paper_fund SET
-                current_balance = ?,
-                total_profit = total_profit + ?,
-                total_loss = total_loss + ?,
-                total_fees_paid = total_fees_paid + ?,
-                total_trades = total_trades + 1,
-                winning_trades = winning_trades + ?,
-                losing_trades = losing_trades + ?,
-                last_updated_at = ?
-            WHERE id = 1
-        """, (new_balance, profit, loss, fee, 1 if is_win else 0, 1 if is_loss else 0, now))
-        await db.commit()
+    """Credit a resolved trade's payout and stats to the paper fund"""
+    global _fund_version
+    db = await get_db()
+    await db.execute(_CREDIT_PAPER_FUND, (
+        payout, profit, loss, fee, 1, 1 if is_win else 0, 1 if is_loss else 0, _now_iso()
+    ))
+    await _commit_later()
+    _fund_version += 1
 
 async def get_daily_spend() -> float:
     """Get total amount spent on trades today"""
     today = datetime.utcnow().date().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        cursor = await db.execute("""
-            SELECT SUM(cost + fee) as total_spend
-            FROM paper_trades
-            WHERE DATE(created_at) = ?
-        """, (today,))
+    db = await get_db()
+    cursor = await db.execute(
+        "SELECT gross_spend FROM daily_spend WHERE date = ?", (today,)
+    )
+    row = await cursor.fetchone()
+    return row[0] if row and row[0] else 0.0
+
+async def get_trade_preflight() -> Optional[Tuple[float, float, float]]:
+    """
+    Everything simulate_trade checks before a trade, in one query
+    Returns (current_balance, open_positions_value, daily_spend),
+    or None if the paper fund doesn't exist
+    """
+    today = datetime.utcnow().date().isoformat()
+    db = await get_db()
+    async with db.execute("""
+        SELECT
+            pf.current_balance,
+            (SELECT COALESCE(SUM(cost), 0) FROM paper_trades WHERE status = 'OPEN'),
+            COALESCE((SELECT gross_spend FROM daily_spend WHERE date = ?), 0)
+        FROM paper_fund pf
+        WHERE pf.id = 1
+    """, (today,)) as cursor:
         row = await cursor.fetchone()
-        return row[0] if row and row[0] else 0.0
+        return tuple(row) if row else None
 
 
 # ============================================================================
 # PAPER TRADES OPERATIONS
 # ============================================================================
 
+# Bumped whenever a trade is opened or resolved, so readers of the open
+# trades (e.g. the dashboard) can skip refetching an unchanged set
+_open_trades_version = 0
+
+def get_open_trades_version() -> int:
+    """Current open-trades write version (in-process, no query)"""
+    return _open_trades_version
+
 async def create_paper_trade(
     strategy_id: str,
     market_id: str,
@@ -201,26 +490,126 @@ async def create_paper_trade(
     resolution_time: Optional[str] = None
 ) -> int:
     """Create a new paper trade"""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
+    global _open_trades_version
+    now = _now_iso()
+    db = await get_db()
+    cursor = await db.execute("""
+        INSERT INTO paper_trades (
+            strategy_id, market_id, market_name, asset, side, price, shares,
+            cost, fee, arb_id, resolution_time, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (strategy_id, market_id, market_name, asset, side, price, shares, cost, fee, arb_id, resolution_time, now))
+    trade_id = cursor.lastrowid
+    _open_trades_version += 1
+    await db.execute("""
+        INSERT INTO daily_spend (date, gross_spend) VALUES (?, ?)
+        ON CONFLICT(date) DO UPDATE SET gross_spend = gross_spend + excluded.gross_spend
+    """, (now[:10], cost + fee))
+    await _commit_later()
+    return trade_id
+
+async def execute_trade_atomic(
+    strategy_id: str,
+    market_id: str,
+    market_name: str,
+    side: str,
+    price: float,
+    shares: float,
+    cost: float,
+    fee: float,
+    total_cost: float,
+    arb_id: Optional[str] = None,
+    asset: Optional[str] = None,
+    resolution_time: Optional[str] = None
+) -> Optional[int]:
+    """
+    Deduct total_cost from the fund and record the trade
+    The deduction is a single conditional UPDATE, so two strategies trading
+    at once can't both spend the same balance
+    Returns the trade id, or None if the balance no longer covers total_cost
+    """
+    global _fund_version, _open_trades_version
+    now = _now_iso()
+    db = await get_db()
+    cursor = await db.execute("""
+        UPDATE paper_fund SET
+            current_balance = current_balance - ?,
+            total_trades = total_trades + 1,
+            last_updated_at = ?
+        WHERE id = 1 AND current_balance >= ?
+    """, (total_cost, now, total_cost))
+    if cursor.rowcount != 1:
+        return None
+    _fund_version += 1
+    
+    try:
         cursor = await db.execute("""
             INSERT INTO paper_trades (
                 strategy_id, market_id, market_name, asset, side, price, shares,
                 cost, fee, arb_id, resolution_time, created_at
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (strategy_id, market_id, market_name, asset, side, price, shares, cost, fee, arb_id, resolution_time, now))
-        await db.commit()
-        return cursor.lastrowid
+    except Exception:
+        # Give the money back - rolling back would also drop other pending writes
+        await db.execute("""
+            UPDATE paper_fund SET
+                current_balance = current_balance + ?,
+                total_trades = total_trades - 1
+            WHERE id = 1
+        """, (total_cost,))
+        _fund_version += 1
+        await _commit_later()
+        raise
+    
+    trade_id = cursor.lastrowid
+    _open_trades_version += 1
+    await db.execute("""
+        INSERT INTO daily_spend (date, gross_spend) VALUES (?, ?)
+        ON CONFLICT(date) DO UPDATE SET gross_spend = gross_spend + excluded.gross_spend
+    """, (now[:10], cost + fee))
+    await _commit_later()
+    return trade_id
+
+_SELECT_OPEN_TRADES = f"SELECT {_PAPER_TRADE_COLUMNS} FROM paper_trades WHERE status = 'OPEN'"
 
-async def get_open_trades() -> List[Dict[str, Any]]:
+async def get_open_trades() -> List[PaperTradeRow]:
     """Get all open trades"""
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM paper_trades WHERE status = 'OPEN'"
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+    db = await get_db()
+    async with db.execute(_SELECT_OPEN_TRADES) as cursor:
+        rows = await cursor.fetchall()
+        return list(map(PaperTradeRow._make, rows))
+
+async def get_open_position_status(strategy_id: str, market_id: str) -> Tuple[int, bool]:
+    """
+    Open trade count for one strategy, and whether one of them is on market_id
+    Both come from one probe of the open-trades index
+    """
+    db = await get_db()
+    async with db.execute("""
+        SELECT COUNT(*), COALESCE(MAX(market_id = ?), 0)
+        FROM paper_trades
+        WHERE status = 'OPEN' AND strategy_id = ?
+    """, (market_id, strategy_id)) as cursor:
+        count, has_market = await cursor.fetchone()
+        return count, bool(has_market)
+
+_SELECT_OPEN_TRADES_DUE = f"""
+    SELECT {_PAPER_TRADE_COLUMNS} FROM paper_trades
+    WHERE status = 'OPEN'
+    AND (resolution_time IS NULL OR resolution_time <= ?)
+"""
+
+async def get_open_trades_due(now: datetime) -> List[PaperTradeRow]:
+    """
+    Get open trades whose market may have resolved by `now` (naive UTC)
+    Trades with no known resolution time are always included
+    """
+    # ISO-8601 strings compare lexicographically; the slack covers late settlement
+    cutoff = (now + timedelta(seconds=config.RESOLUTION_TIME_SLACK)).isoformat()
+    db = await get_db()
+    async with db.execute(_SELECT_OPEN_TRADES_DUE, (cutoff,)) as cursor:
+        rows = await cursor.fetchall()
+        return list(map(PaperTradeRow._make, rows))
 
 async def resolve_trade(
     trade_id: int,
@@ -229,9 +618,52 @@ async def resolve_trade(
     profit_or_loss: float
 ) -> None:
     """Mark trade as resolved"""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        await db.execute("""
+    global _open_trades_version
+    now = _now_iso()
+    db = await get_db()
+    await db.execute("""
+        UPDATE paper_trades SET
+            status = 'RESOLVED',
+            outcome = ?,
+            payout = ?,
+            profit_or_loss = ?,
+            resolved_at = ?
+        WHERE id = ?
+    """, (outcome, payout, profit_or_loss, now, trade_id))
+    _open_trades_version += 1
+    await _commit_later()
+
+async def resolve_trades_bulk(resolutions: List[TradeResolution]) -> None:
+    """
+    Settle a batch of trades atomically
+    Marks each trade resolved, credits the fund once with the batch totals
+    and folds the batch into today's per-strategy P&L - a failure rolls all
+    three back so the trades stay OPEN and are retried next cycle
+    """
+    if not resolutions:
+        return
+    
+    global _fund_version, _open_trades_version
+    now = _now_iso()
+    today = now[:10]
+    db = await get_db()
+    
+    # One fund credit for the whole batch
+    wins = [r.profit_or_loss for r in resolutions if r.profit_or_loss > 0]
+    losses = [r.profit_or_loss for r in resolutions if r.profit_or_loss < 0]
+    
+    # Per-strategy totals for today
+    daily: Dict[str, List[float]] = {}
+    for r in resolutions:
+        if r.strategy_id in _DAILY_PNL_FIELDS:
+            totals = daily.setdefault(r.strategy_id, [0.0, 0])
+            totals[0] += r.profit_or_loss
+            totals[1] += 1
+    
+    # Savepoint, not BEGIN - other writers share the pending group-commit transaction
+    await db.execute("SAVEPOINT resolve_batch")
+    try:
+        await db.executemany("""
             UPDATE paper_trades SET
                 status = 'RESOLVED',
                 outcome = ?,
@@ -239,116 +671,197 @@ async def resolve_trade(
                 profit_or_loss = ?,
                 resolved_at = ?
             WHERE id = ?
-        """, (outcome, payout, profit_or_loss, now, trade_id))
-        await db.commit()
+        """, [(r.outcome, r.payout, r.profit_or_loss, now, r.trade_id) for r in resolutions])
+        
+        await db.execute(_CREDIT_PAPER_FUND, (
+            sum(r.payout for r in resolutions),
+            sum(wins),
+            -sum(losses),
+            sum(r.fee for r in resolutions),
+            len(resolutions),
+            len(wins),
+            len(losses),
+            now
+        ))
+        
+        await db.executemany("""
+            INSERT INTO daily_pnl_v2 (date, strategy, pnl, trades)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(date, strategy) DO UPDATE SET
+                pnl = pnl + excluded.pnl,
+                trades = trades + excluded.trades
+        """, [(today, strategy, pnl, trades) for strategy, (pnl, trades) in daily.items()])
+    except Exception:
+        await db.execute("ROLLBACK TO resolve_batch")
+        await db.execute("RELEASE resolve_batch")
+        raise
+    await db.execute("RELEASE resolve_batch")
+    _open_trades_version += 1
+    _fund_version += 1
+    
+    await _commit_later()
+
+_SELECT_RECENT_TRADES = f"""
+    SELECT {_PAPER_TRADE_COLUMNS} FROM paper_trades
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
 
-async def get_recent_trades(limit: int = 50) -> List[Dict[str, Any]]:
+async def get_recent_trades(limit: int = 50) -> List[PaperTradeRow]:
     """Get recent trades for TUI display"""
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute("""
-            SELECT * FROM paper_trades
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (limit,)) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+    db = await get_db()
+    async with db.execute(_SELECT_RECENT_TRADES, (limit,)) as cursor:
+        rows = await cursor.fetchall()
+        return list(map(PaperTradeRow._make, rows))
 
 # ============================================================================
 # WHALE OPERATIONS
 # ============================================================================
 
-async def upsert_whale(
-    wallet_address: str,
-    profit_7d: float,
-    total_trades: int,
-    win_rate: float,
-    last_trade_at: str,
-    cluster_id: Optional[str] = None
+async def upsert_whales_bulk(
+    whales: List[Tuple[str, float, int, float, str]]
 ) -> None:
-    """Insert or update whale data"""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        await db.execute("""
-            INSERT INTO whales (
-                wallet_address, profit_7d, total_trades, win_rate,
-                last_trade_at, cluster_id, discovered_at, last_checked_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(wallet_address) DO UPDATE SET
-                profit_7d = excluded.profit_7d,
-                total_trades = excluded.total_trades,
-                win_rate = excluded.win_rate,
-                last_trade_at = excluded.last_trade_at,
-                cluster_id = excluded.cluster_id,
-                last_checked_at = excluded.last_checked_at
-        """, (wallet_address, profit_7d, total_trades, win_rate, last_trade_at, cluster_id, now, now))
-        await db.commit()
-
-async def get_active_whales() -> List[Dict[str, Any]]:
-    """Get all active whales"""
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM whales WHERE is_active = 1 ORDER BY profit_7d DESC"
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
-
-async def log_whale_trade(
-    wallet_address: str,
-    market_id: str,
-    side: str,
-    price: float,
-    shares: float
-) -> bool:
-    """Log a whale trade with duplicate detection. Returns True if logged, False if duplicate."""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        # Check for duplicate (same wallet, market, side within last 5 minutes)
-        cursor = await db.execute("""
-            SELECT id FROM whale_trades 
-            WHERE wallet_address = ? 
-            AND market_id = ? 
-            AND side = ?
-            AND datetime(timestamp) > datetime('now', '-5 minutes')
-        """, (wallet_address, market_id, side))
-        
-        existing = await cursor.fetchone()
-        if existing:
-            return False  # Duplicate
-        
-        # Log new trade
-        await db.execute("""
+    """
+    Insert or update many whales in one executemany
+    whales: (wallet_address, profit_7d, total_trades, win_rate, last_trade_at) tuples
+    """
+    if not whales:
+        return
+    
+    global _whales_version
+    now = _now_iso()
+    db = await get_db()
+    await db.executemany("""
+        INSERT INTO whales (
+            wallet_address, profit_7d, total_trades, win_rate,
+            last_trade_at, cluster_id, discovered_at, last_checked_at
+        ) VALUES (?, ?, ?, ?, ?, NULL, ?, ?)
+        ON CONFLICT(wallet_address) DO UPDATE SET
+            profit_7d = excluded.profit_7d,
+            total_trades = excluded.total_trades,
+            win_rate = excluded.win_rate,
+            last_trade_at = excluded.last_trade_at,
+            cluster_id = excluded.cluster_id,
+            last_checked_at = excluded.last_checked_at
+    """, [(*whale, now, now) for whale in whales])
+    await _commit_later()
+    _whales_version += 1
+
+_SELECT_ACTIVE_WHALES = f"SELECT {_WHALE_COLUMNS} FROM whales WHERE is_active = 1 ORDER BY profit_7d DESC"
+
+# Active whale list, versioned the same way as the fund cache
+_whales_cache: List[WhaleRow] = []
+_whales_wallets: frozenset = frozenset()
+_whales_cached_version = -1
+_whales_version = 0
+
+async def get_active_whales() -> List[WhaleRow]:
+    """Get all active whales (cached until a whale is written)"""
+    global _whales_cache, _whales_wallets, _whales_cached_version
+    if _whales_cached_version == _whales_version:
+        return list(_whales_cache)
+    
+    version = _whales_version
+    db = await get_db()
+    async with db.execute(_SELECT_ACTIVE_WHALES) as cursor:
+        rows = await cursor.fetchall()
+    whales = list(map(WhaleRow._make, rows))
+    if version == _whales_version:
+        _whales_cache = whales
+        _whales_wallets = frozenset(whale.wallet_address for whale in whales)
+        _whales_cached_version = version
+    return list(whales)
+
+async def get_active_wallets() -> frozenset:
+    """
+    Wallet addresses of all active whales, for membership tests
+    Built once per whale write alongside the get_active_whales cache
+    """
+    if _whales_cached_version != _whales_version:
+        whales = await get_active_whales()
+        if _whales_cached_version != _whales_version:
+            # Raced a write - the cache wasn't refreshed, use this read directly
+            return frozenset(whale.wallet_address for whale in whales)
+    return _whales_wallets
+
+async def get_active_whale_count() -> int:
+    """
+    Number of active whales
+    Free while the whale cache is fresh, otherwise a COUNT(*) (no rows loaded)
+    """
+    if _whales_cached_version == _whales_version:
+        return len(_whales_wallets)
+    db = await get_db()
+    async with db.execute("SELECT COUNT(*) FROM whales WHERE is_active = 1") as cursor:
+        (count,) = await cursor.fetchone()
+        return count
+
+async def log_whale_trades_bulk(
+    trades: List[Tuple[str, str, str, float, float]]
+) -> List[bool]:
+    """
+    Log many whale trades with one duplicate query and one commit
+    trades: (wallet_address, market_id, side, price, shares) tuples
+    Returns one flag per trade - True if logged, False if duplicate
+    (same wallet, market, side within the last 5 minutes, or earlier in the batch)
+    """
+    if not trades:
+        return []
+    
+    now_dt = datetime.utcnow()
+    now = now_dt.isoformat()
+    cutoff = (now_dt - timedelta(minutes=5)).isoformat()
+    db = await get_db()
+    
+    # Find which (wallet, market, side) keys already have a recent trade
+    keys = list({trade[:3] for trade in trades})
+    placeholders = ", ".join(["(?, ?, ?)"] * len(keys))
+    cursor = await db.execute(f"""
+        WITH candidates(wallet_address, market_id, side) AS (VALUES {placeholders})
+        SELECT DISTINCT c.wallet_address, c.market_id, c.side
+        FROM candidates c
+        JOIN whale_trades w
+            ON w.wallet_address = c.wallet_address
+            AND w.market_id = c.market_id
+            AND w.side = c.side
+            AND w.timestamp > ?
+    """, (*(value for key in keys for value in key), cutoff))
+    seen = {tuple(row) for row in await cursor.fetchall()}
+    
+    logged = []
+    new_rows = []
+    for wallet_address, market_id, side, price, shares in trades:
+        key = (wallet_address, market_id, side)
+        if key in seen:
+            logged.append(False)  # Duplicate
+            continue
+        seen.add(key)
+        new_rows.append((wallet_address, market_id, side, price, shares, now))
+        logged.append(True)
+    
+    if new_rows:
+        await db.executemany("""
             INSERT INTO whale_trades (
                 wallet_address, market_id, side, price, shares, timestamp
             ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (wallet_address, market_id, side, price, shares, now))
-        await db.commit()
-        return True  # Logged successfully
+        """, new_rows)
+        await _commit_later()
+    return logged
 
-async def get_whale_trades_for_market(market_id: str, since: datetime) -> List[Dict[str, Any]]:
-    """Get all whale trades for a specific market since a given time"""
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        cursor = await db.execute("""
-            SELECT wallet_address, market_id, side, price, shares, timestamp
-            FROM whale_trades
-            WHERE market_id = ?
-            AND datetime(timestamp) > datetime(?)
-            ORDER BY timestamp DESC
-        """, (market_id, since.isoformat()))
-        
-        rows = await cursor.fetchall()
-        return [
-            {
-                "wallet_address": row[0],
-                "market_id": row[1],
-                "side": row[2],
-                "price": row[3],
-                "shares": row[4],
-                "timestamp": row[5]
-            }
-            for row in rows
-        ]
+async def count_unique_whales_by_side(market_id: str, since: datetime) -> Dict[str, int]:
+    """
+    Count distinct whale wallets per side on a market since a given time
+    Returns e.g. {"YES": 2, "NO": 1}; sides with no trades are absent
+    """
+    db = await get_db()
+    async with db.execute("""
+        SELECT side, COUNT(DISTINCT wallet_address)
+        FROM whale_trades
+        WHERE market_id = ?
+        AND timestamp > ?
+        GROUP BY side
+    """, (market_id, since.isoformat())) as cursor:
+        return dict(await cursor.fetchall())
 
 # ============================================================================
 # SIGNAL OPERATIONS
@@ -362,57 +875,77 @@ async def create_signal(
     price_at_signal: float
 ) -> int:
     """Create a new signal"""
-    now = datetime.utcnow().isoformat()
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        cursor = await db.execute("""
-            INSERT INTO signals (
-                market_id, side, whale_count, confidence, price_at_signal, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (market_id, side, whale_count, confidence, price_at_signal, now))
-        await db.commit()
-        return cursor.lastrowid
+    now = _now_iso()
+    db = await get_db()
+    cursor = await db.execute("""
+        INSERT INTO signals (
+            market_id, side, whale_count, confidence, price_at_signal, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """, (market_id, side, whale_count, confidence, price_at_signal, now))
+    await _commit_later()
+    return cursor.lastrowid
 
 # ============================================================================
 # DAILY P&L OPERATIONS
 # ============================================================================
 
+# Strategy id -> DailyPnlRow field for the per-strategy P&L
+_DAILY_PNL_FIELDS = {
+    "NEGRISK_ARB": "negrisk_arb_pnl",
+    "HIGH_PROB_BOND": "high_prob_bond_pnl",
+    "WHALE_COPY": "whale_copy_pnl",
+    "TEMPORAL_ARB": "temporal_arb_pnl"
+}
+
 async def update_daily_pnl(strategy_id: str, pnl: float) -> None:
     """Update daily P&L for a strategy"""
-    today = datetime.utcnow().date().isoformat()
-    
-    # Map strategy_id to column name
-    strategy_columns = {
-        "NEGRISK_ARB": "negrisk_arb_pnl",
-        "HIGH_PROB_BOND": "high_prob_bond_pnl",
-        "WHALE_COPY": "whale_copy_pnl",
-        "TEMPORAL_ARB": "temporal_arb_pnl"
-    }
-    
-    column = strategy_columns.get(strategy_id)
-    if not column:
+    if strategy_id not in _DAILY_PNL_FIELDS:
         return
     
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        # Insert or update
-        await db.execute(f"""
-            INSERT INTO daily_pnl (date, {column}, total_pnl, total_trades)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(date) DO UPDATE SET
-                {column} = {column} + excluded.{column},
-                total_pnl = total_pnl + excluded.total_pnl,
-                total_trades = total_trades + 1
-        """, (today, pnl, pnl))
-        await db.commit()
-
-async def get_daily_pnl(date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    today = datetime.utcnow().date().isoformat()
+    db = await get_db()
+    # Insert or update (one static statement for every strategy)
+    await db.execute("""
+        INSERT INTO daily_pnl_v2 (date, strategy, pnl, trades)
+        VALUES (?, ?, ?, 1)
+        ON CONFLICT(date, strategy) DO UPDATE SET
+            pnl = pnl + excluded.pnl,
+            trades = trades + 1
+    """, (today, strategy_id, pnl))
+    await _commit_later()
+
+async def get_daily_pnl(date: Optional[str] = None) -> Optional[DailyPnlRow]:
     """Get P&L for a specific date (defaults to today)"""
     if not date:
         date = datetime.utcnow().date().isoformat()
     
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM daily_pnl WHERE date = ?", (date,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+    db = await get_db()
+    async with db.execute(
+        "SELECT strategy, pnl, trades FROM daily_pnl_v2 WHERE date = ?", (date,)
+    ) as cursor:
+        rows = await cursor.fetchall()
+    if not rows:
+        return None
+    
+    # Pivot the long-form rows back into one row per day
+    day = dict.fromkeys(DailyPnlRow._fields, 0)
+    day["date"] = date
+    for strategy, pnl, trades in rows:
+        field = _DAILY_PNL_FIELDS.get(strategy)
+        if field:
+            day[field] += pnl
+        day["total_pnl"] += pnl
+        day["total_trades"] += trades
+    return DailyPnlRow(**day)
+
+async def get_dashboard_snapshot() -> DashboardSnapshot:
+    """
+    Fund, active whale count and today's P&L for one dashboard refresh
+    The fund and whale reads are served from their caches while unchanged,
+    so an idle tick costs the single daily P&L query
+    """
+    # Queued together - the connection's worker thread runs them back to back
+    fund, whale_count, daily = await asyncio.gather(
+        get_paper_fund(), get_active_whale_count(), get_daily_pnl()
+    )
+    return DashboardSnapshot(fund, whale_count, daily)
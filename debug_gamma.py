@@ -1,5 +1,6 @@
 import asyncio
 from apis import gamma
+from apis._client import get_client, aclose_all
 from tui.logger import tui_print
 import config
 
@@ -40,28 +41,31 @@ async def test_gamma():
                 params = {"market": cond_id, "limit": 1}
                 print(f"Requesting: {url} with params {params}")
                 
-                async with gamma.httpx.AsyncClient(verify=False, http2=False) as client:
-                    resp = await client.get(url, params=params, timeout=5.0)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if data and isinstance(data, list) and len(data) > 0:
-                            trade = data[0]
-                            title = trade.get('title')
-                            print(f"  -> Got Trade! Title: {title}")
-                            if "bitcoin" in title.lower() or "btc" in title.lower():
-                                print("  *** SUCCESS! match found via Data API ***")
-                            else:
-                                print("  (Mismatch in title logic, but API call worked)")
+                # Shared HTTP/2 client (same pool and TLS settings as the bot)
+                client = get_client()
+                resp = await client.get(url, params=params, timeout=5.0)
+                if resp.status_code == 200:
+                    data = resp.json()
+                    if data and isinstance(data, list) and len(data) > 0:
+                        trade = data[0]
+                        title = trade.get('title')
+                        print(f"  -> Got Trade! Title: {title}")
+                        if "bitcoin" in title.lower() or "btc" in title.lower():
+                            print("  *** SUCCESS! match found via Data API ***")
                         else:
-                            print("  -> Success (200) but empty list (no recent trades?)")
+                            print("  (Mismatch in title logic, but API call worked)")
                     else:
-                         print(f"  -> HTTP {resp.status_code}: {resp.text}")
+                        print("  -> Success (200) but empty list (no recent trades?)")
+                else:
+                     print(f"  -> HTTP {resp.status_code}: {resp.text}")
 
             except Exception as e:
                 print(f"  -> Error: {e}")
 
     else:
         print("No active crypto markets found to test with.")
+    
+    await aclose_all()
 
 if __name__ == "__main__":
     asyncio.run(test_gamma())
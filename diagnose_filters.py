@@ -1,5 +1,6 @@
 import asyncio
 from apis import data
+from strategies import whale_copy
 from tui.logger import tui_print
 import config
 
@@ -54,7 +55,7 @@ async def diagnose():
             print(f"  > Market Question: '{final_question}'")
             
             # Run the EXACT check from whale_copy.py
-            is_crypto = any(x in final_question.lower() for x in ["btc", "eth", "bitcoin", "ethereum"])
+            is_crypto = whale_copy.detect_asset(final_question) is not None
             
             if is_crypto:
                 print("  ✅ PASS: Market is Crypto")
@@ -0,0 +1,17 @@
+"""
+Event loop selection shared by the bot and the standalone dashboard
+"""
+
+import asyncio
+import sys
+
+def install_event_loop_policy():
+    """Use uvloop (winloop on Windows) when it's available"""
+    try:
+        if sys.platform == "win32":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(fast_loop.EventLoopPolicy())
@@ -3,11 +3,29 @@ Paper Trading Engine
 Simulates trades without real money, tracks virtual balance
 """
 
+import asyncio
 import config
 from database import db
 from typing import Optional
 import math
+import numpy as np
 from tui.logger import tui_print
+from apis._guard import ensure_single_import
+
+__all__ = [
+    "calculate_fee",
+    "calculate_fees_batch",
+    "simulate_trade",
+    "get_available_balance",
+    "calculate_position_size",
+]
+
+# Holds the only simulate_trade with daily-cap checks - never shadow it
+ensure_single_import(__name__, __file__)
+
+# Serializes the preflight read and the debit so concurrent trades
+# (e.g. gathered arbitrage legs) each see the previous one's spend
+_trade_lock = asyncio.Lock()
 
 def calculate_fee(shares: float, price: float, is_crypto_15min: bool = True) -> float:
     """
@@ -27,8 +45,28 @@ def calculate_fee(shares: float, price: float, is_crypto_15min: bool = True) ->
         return 0.0
     
     # Polymarket's fee formula
-    fee = shares * config.FEE_RATE * math.pow(price * (1 - price), config.FEE_EXPONENT)
-    return round(fee, 6)
+    pq = price * (1 - price)
+    if config.FEE_EXPONENT == 2:
+        return round(shares * config.FEE_RATE * pq * pq, 6)
+    return round(shares * config.FEE_RATE * math.pow(pq, config.FEE_EXPONENT), 6)
+
+def calculate_fees_batch(
+    shares: np.ndarray,
+    prices: np.ndarray,
+    is_crypto_15min: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized calculate_fee over arrays of shares, prices and fee flags
+    
+    Returns:
+        Fee amount in USD per element (0 where the market is fee-free)
+    """
+    pq = prices * (1.0 - prices)
+    if config.FEE_EXPONENT == 2:
+        powered = pq * pq
+    else:
+        powered = pq ** config.FEE_EXPONENT
+    return np.where(is_crypto_15min, np.round(shares * config.FEE_RATE * powered, 6), 0.0)
 
 async def simulate_trade(
     strategy_id: str,
@@ -60,96 +98,109 @@ async def simulate_trade(
     Returns:
         Trade ID if successful, None if insufficient balance
     """
-    # Get current balance
-    fund = await db.get_paper_fund()
-    if not fund:
-        tui_print("Error: Paper fund not initialized")
-        return None
-    
-    current_balance = fund["current_balance"]
-    
-    # Calculate fees and total cost first to check against limits
-    shares = position_size_usd / price
-    fee = calculate_fee(shares, price, is_crypto_15min)
-    total_cost = position_size_usd + fee
+    async with _trade_lock:
+        # Balance, open position value and today's spend in one query
+        preflight = await db.get_trade_preflight()
+        if not preflight:
+            tui_print("Error: Paper fund not initialized")
+            return None
+        
+        current_balance, open_positions_value, daily_spend = preflight
+        
+        # Calculate fees and total cost first to check against limits
+        shares = position_size_usd / price
+        fee = calculate_fee(shares, price, is_crypto_15min)
+        total_cost = position_size_usd + fee
 
-    # DAILY INVESTMENT CAP CHECK
-    # Calculate Total Account Value (NAV) = Cash + Cost of Open Positions
-    # (Using cost is safer/simpler than market value for this check)
-    open_trades = await db.get_open_trades()
-    open_positions_value = sum(t['cost'] for t in open_trades)
-    total_account_value = current_balance + open_positions_value
-    
-    # Calculate spending today
-    daily_spend = await db.get_daily_spend()
-    
-    # Limit: 50% of Total Account Value
-    daily_limit = total_account_value * config.DAILY_VOLUME_CAP_PCT
-    
-    if (daily_spend + total_cost) > daily_limit:
-        tui_print(f"⚠️  Daily investment limit reached! Spend: ${daily_spend:.2f} + ${total_cost:.2f} > ${daily_limit:.2f} (50% of ${total_account_value:.2f})")
-        return None
+        # DAILY INVESTMENT CAP CHECK
+        # Calculate Total Account Value (NAV) = Cash + Cost of Open Positions
+        # (Using cost is safer/simpler than market value for this check)
+        total_account_value = current_balance + open_positions_value
+        
+        # Limit: 50% of Total Account Value
+        daily_limit = total_account_value * config.DAILY_VOLUME_CAP_PCT
+        
+        if (daily_spend + total_cost) > daily_limit:
+            tui_print(f"⚠️  Daily investment limit reached! Spend: ${daily_spend:.2f} + ${total_cost:.2f} > ${daily_limit:.2f} (50% of ${total_account_value:.2f})")
+            return None
 
-    # Check sufficient balance
-    if total_cost > current_balance:
-        # If we have balance issues but haven't hit the daily cap, try to adjust size
-        # However, for strategy consistency, we might just fail here or adjust
-        if current_balance < 1.0: # Minimum trade check
-             tui_print(f"Insufficient balance: need ${total_cost:.2f}, have ${current_balance:.2f}")
-             return None
+        # Check sufficient balance
+        if total_cost > current_balance:
+            # If we have balance issues but haven't hit the daily cap, try to adjust size
+            # However, for strategy consistency, we might just fail here or adjust
+            if current_balance < 1.0: # Minimum trade check
+                 tui_print(f"Insufficient balance: need ${total_cost:.2f}, have ${current_balance:.2f}")
+                 return None
+        
+            # Adjust to max available
+            available = current_balance - 0.05 # Leave tiny buffer
+            if available < 1.0:
+                return None
         
-        # Adjust to max available
-        available = current_balance - 0.05 # Leave tiny buffer
-        if available < 1.0:
+            # Recalculate based on available
+            shares = available / price
+            fee = calculate_fee(shares, price, is_crypto_15min)
+            total_cost = available # Approx
+            position_size_usd = total_cost - fee
+            tui_print(f"  ℹ️  Adjusted position to available balance: ${position_size_usd:.2f}")
+
+        # Double-check total cost doesn't exceed balance strict check
+        if total_cost > current_balance:
             return None
         
-        # Recalculate based on available
-        shares = available / price
-        fee = calculate_fee(shares, price, is_crypto_15min)
-        total_cost = available # Approx
-        position_size_usd = total_cost - fee
-        tui_print(f"  ℹ️  Adjusted position to available balance: ${position_size_usd:.2f}")
+        # shares and fee are calculated above or adjusted
 
-    # Double-check total cost doesn't exceed balance strict check
-    if total_cost > current_balance:
+        
+        # Deduct from balance and create trade record together
+        trade_id = await db.execute_trade_atomic(
+            strategy_id=strategy_id,
+            market_id=market_id,
+            market_name=market_name,
+            side=side,
+            price=price,
+            shares=shares,
+            cost=position_size_usd,
+            fee=fee,
+            total_cost=total_cost,
+            arb_id=arb_id,
+            asset=asset,
+            resolution_time=resolution_time
+        )
+    if trade_id is None:
+        tui_print(f"Insufficient balance: need ${total_cost:.2f} (balance changed by a concurrent trade)")
         return None
     
-    # shares and fee are calculated above or adjusted
-
-    
-    # Create trade record
-    trade_id = await db.create_paper_trade(
-        strategy_id=strategy_id,
-        market_id=market_id,
-        market_name=market_name,
-        side=side,
-        price=price,
-        shares=shares,
-        cost=position_size_usd,
-        fee=fee,
-        arb_id=arb_id,
-        asset=asset,
-        resolution_time=resolution_time
+    tui_print(
+        "✓ Paper trade executed: %s | %s | %s @ $%.3f | %.2f shares | Fee: $%.3f",
+        strategy_id, market_name, side, price, shares, fee
     )
     
-    # Deduct from balance
-    new_balance = current_balance - total_cost
-    await db.update_paper_fund_balance(new_balance)
-    
-    tui_print(f"✓ Paper trade executed: {strategy_id} | {market_name} | {side} @ ${price:.3f} | {shares:.2f} shares | Fee: ${fee:.3f}")
-    
     return trade_id
 
+# Whale copy sizing per confidence tier (STRONG, HIGH, MEDIUM)
+# Kelly tiers are Half Kelly for a ~60% win rate at a baseline entry of 0.55:
+# Kelly = (W - p) / (1 - p) = (0.60 - 0.55) / 0.45 ≈ 11%, halved ≈ 5%
+_KELLY_MODE = getattr(config, "RISK_MANAGEMENT_MODE", None) == "KELLY"
+_WHALE_SIZES_KELLY = (0.05, 0.03, 0.02)
+_WHALE_SIZES_FIXED = (
+    config.WHALE_POSITION_STRONG,
+    config.WHALE_POSITION_HIGH,
+    config.WHALE_POSITION_MEDIUM
+)
+_WHALE_SIZES = _WHALE_SIZES_KELLY if _KELLY_MODE else _WHALE_SIZES_FIXED
+_CONFIDENCE_TIER = {"STRONG": 0, "HIGH": 1, "MEDIUM": 2}
+
 async def get_available_balance() -> float:
     """Get current available balance for trading"""
     fund = await db.get_paper_fund()
     if not fund:
         return 0.0
-    return fund["current_balance"]
+    return fund.current_balance
 
 async def calculate_position_size(
     strategy_id: str,
-    confidence: Optional[str] = None
+    confidence: Optional[str] = None,
+    balance: Optional[float] = None
 ) -> float:
     """
     Calculate position size based on strategy and confidence
@@ -157,11 +208,13 @@ async def calculate_position_size(
     Args:
         strategy_id: Strategy identifier
         confidence: For whale copy: "STRONG", "HIGH", "MEDIUM"
+        balance: Balance snapshot the caller already holds (read from DB if None)
     
     Returns:
         Position size in USD
     """
-    balance = await get_available_balance()
+    if balance is None:
+        balance = await get_available_balance()
     
     if strategy_id == "NEGRISK_ARB":
         # Max 10% of balance per arbitrage opportunity
@@ -172,45 +225,9 @@ async def calculate_position_size(
         return balance * config.BOND_DEFAULT_POSITION_PCT
     
     elif strategy_id == "WHALE_COPY":
-        # Risk Management: Kelly Criterion vs Fixed
-        if hasattr(config, 'RISK_MANAGEMENT_MODE') and config.RISK_MANAGEMENT_MODE == "KELLY":
-            # Need price to calculate odds, but function sig limits us. 
-            # We will use confidence to adjust the Kelly Fraction slightly if needed,
-            # but ideally we need the price passed in. 
-            # modifying calculate_position_size signature is risky for existing calls.
-            # We will infer 'b' (odds) assumes a roughly 1:1 payout (price ~0.5) if not available,
-            # BUT for accurate Kelly we really need the price.
-            # Let's use a safe default assuming price is around 0.5-0.6 (odds ~0.8)
-            # Better approach: Use fixed tiers but calibrated by Kelly logic conceptually
-            
-            # HOWEVER, for true Kelly, we should calculate it dynamically.
-            # Since we can't easily change the signature everywhere safely in one go,
-            # we'll stick to the "Confidence Tiers" which are effectively simplified Kelly
-            # for 60% win rate at different conviction levels.
-            
-            # If user strictly wants Kelly math:
-            # Kelly % = W - (1-W)/R where R = profit/loss ratio.
-            # for binary options, R = (1-p)/p where p is entry price.
-            # So Kelly = W - (1-W)/((1-p)/p) = W - (1-W)*p/(1-p) = (W - p) / (1-p)
-            
-            # We will use a baseline price of 0.55 for sizing roughly.
-            # Kelly = (0.60 - 0.55) / (1 - 0.55) = 0.05 / 0.45 = 11%
-            # Half Kelly = 5.5%
-            
-            if confidence == "STRONG":
-                return balance * 0.05  # ~Half Kelly for 60% win rate
-            elif confidence == "HIGH":
-                return balance * 0.03
-            else:
-                return balance * 0.02
-        else:
-            # Original Fixed Sizing
-            if confidence == "STRONG":
-                return balance * config.WHALE_POSITION_STRONG
-            elif confidence == "HIGH":
-                return balance * config.WHALE_POSITION_HIGH
-            else:  # MEDIUM
-                return balance * config.WHALE_POSITION_MEDIUM
+        # Risk Management: Kelly Criterion vs Fixed (resolved at import)
+        tier = _CONFIDENCE_TIER.get(confidence, 2)
+        return balance * _WHALE_SIZES[tier]
     
     elif strategy_id == "TEMPORAL_ARB":
         # Conservative 1% for temporal arbitrage
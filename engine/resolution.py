@@ -5,7 +5,7 @@ Continuously checks open trades and settles them when markets resolve
 
 import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import config
 from database import db
 from apis import gamma
@@ -19,11 +19,31 @@ async def check_and_resolve_trades():
     """
     while True:
         try:
-            # Get all open trades
-            open_trades = await db.get_open_trades()
+            # Get open trades that could have resolved (future resolution times are skipped in SQL)
+            open_trades = await db.get_open_trades_due(datetime.utcnow())
             
+            # One batched lookup per cycle (trades often share markets, e.g. NegRisk legs)
+            markets = await gamma.fetch_market_details_batch(
+                trade.market_id for trade in open_trades
+            )
+            
+            # Settle everything that resolved this cycle in one DB transaction
+            settled = []
             for trade in open_trades:
-                await process_trade_resolution(trade)
+                market = markets.get(trade.market_id)
+                if market:
+                    resolution = await process_trade_resolution(trade, market)
+                    if resolution:
+                        settled.append((trade, resolution))
+            await db.resolve_trades_bulk([resolution for _, resolution in settled])
+            
+            # Logged only once the batch is written
+            for trade, resolution in settled:
+                tui_print(
+                    "%s Trade resolved: %s | %s | %s | P&L: $%.2f",
+                    "✓" if resolution.outcome == "WIN" else "✗", trade.market_name,
+                    trade.side, resolution.outcome, resolution.profit_or_loss
+                )
             
             # Wait before next check
             await asyncio.sleep(config.RESOLUTION_CHECK_INTERVAL)
@@ -32,28 +52,26 @@ async def check_and_resolve_trades():
             tui_print(f"Error in resolution engine: {e}")
             await asyncio.sleep(config.RESOLUTION_CHECK_INTERVAL)
 
-async def process_trade_resolution(trade: Dict[str, Any]):
+async def process_trade_resolution(
+    trade: db.PaperTradeRow,
+    market: Dict[str, Any]
+) -> Optional[db.TradeResolution]:
     """
-    Check if a trade's market has resolved and settle it
+    Work out a trade's settlement if its market (Gamma market details) has resolved
+    Returns None while the market is still open; the caller writes the batch
     """
-    market_id = trade["market_id"]
-    trade_id = trade["id"]
-    strategy_id = trade["strategy_id"]
-    side = trade["side"]
-    shares = trade["shares"]
-    cost = trade["cost"]
-    fee = trade["fee"]
-    arb_id = trade.get("arb_id")
-    
-    # Fetch market details from Gamma API
-    market = await gamma.fetch_market_details(market_id)
-    if not market:
-        return
+    trade_id = trade.id
+    strategy_id = trade.strategy_id
+    side = trade.side
+    shares = trade.shares
+    cost = trade.cost
+    fee = trade.fee
+    arb_id = trade.arb_id
     
     # Check if resolved
     is_resolved = market.get("resolved", False)
     if not is_resolved:
-        return
+        return None
     
     # Get winning outcome
     winning_outcome = market.get("winningOutcome")  # "YES" or "NO"
@@ -78,41 +96,19 @@ async def process_trade_resolution(trade: Dict[str, Any]):
     
     # Determine if win or loss
     is_win = profit_or_loss > 0
-    is_loss = profit_or_loss < 0
-    
-    # Update trade record
     outcome = "WIN" if is_win else "LOSS"
-    await db.resolve_trade(
+    
+    return db.TradeResolution(
         trade_id=trade_id,
+        strategy_id=strategy_id,
         outcome=outcome,
         payout=payout,
-        profit_or_loss=profit_or_loss
+        profit_or_loss=profit_or_loss,
+        fee=fee
     )
-    
-    # Update paper fund balance
-    fund = await db.get_paper_fund()
-    current_balance = fund["current_balance"]
-    new_balance = current_balance + payout
-    
-    await db.update_paper_fund_balance(
-        new_balance=new_balance,
-        profit=profit_or_loss if is_win else 0,
-        loss=abs(profit_or_loss) if is_loss else 0,
-        fee=fee,
-        is_win=is_win,
-        is_loss=is_loss
-    )
-    
-    # Update daily P&L
-    await db.update_daily_pnl(strategy_id, profit_or_loss)
-    
-    # Log resolution
-    symbol = "✓" if is_win else "✗"
-    color = "green" if is_win else "red"
-    tui_print(f"{symbol} Trade resolved: {trade['market_name']} | {side} | {outcome} | P&L: ${profit_or_loss:.2f}")
 
 async def calculate_negrisk_payout(
-    trade: Dict[str, Any],
+    trade: db.PaperTradeRow,
     winning_outcome: str,
     arb_id: str
 ) -> float:
@@ -123,8 +119,8 @@ async def calculate_negrisk_payout(
     Total payout across all legs = $1.00 per set
     This leg pays $1.00 if it won, $0 if it lost
     """
-    side = trade["side"]
-    shares = trade["shares"]
+    side = trade.side
+    shares = trade.shares
     
     if side == winning_outcome:
         # This leg won
@@ -4,11 +4,36 @@ Initializes database, launches all strategies, and starts TUI
 """
 
 import asyncio
+import os
 import sys
 from database import db
+from apis import _client as http_client
+from tui import logger_async
 from engine import resolution
+from engine.event_loop import install_event_loop_policy
 from strategies import negrisk_arb, high_prob_bond, whale_copy, temporal_arb
 
+class _Shutdown(Exception):
+    """Raised inside the task group when the TUI exits to stop all tasks"""
+
+def _parse_starting_fund(raw: str):
+    """Parse and bound-check a starting fund, printing why it was rejected"""
+    try:
+        starting_fund = float(raw)
+    except ValueError:
+        print("❌ Please enter a valid number")
+        return None
+    
+    if starting_fund < 10:
+        print("❌ Minimum starting fund is $10")
+        return None
+    
+    if starting_fund > 1000000:
+        print("❌ Maximum starting fund is $1,000,000")
+        return None
+    
+    return starting_fund
+
 async def setup_paper_fund():
     """
     Check if paper fund exists, if not prompt user to create one
@@ -16,9 +41,9 @@ async def setup_paper_fund():
     fund = await db.get_paper_fund()
     
     if fund:
-        print(f"\n✓ Paper fund loaded: ${fund['current_balance']:.2f}")
-        print(f"  Starting fund: ${fund['starting_fund']:.2f}")
-        print(f"  All-time P&L: ${fund['total_profit'] - fund['total_loss']:.2f}")
+        print(f"\n✓ Paper fund loaded: ${fund.current_balance:.2f}")
+        print(f"  Starting fund: ${fund.starting_fund:.2f}")
+        print(f"  All-time P&L: ${fund.total_profit - fund.total_loss:.2f}")
         return True
     
     # First run - setup
@@ -28,22 +53,19 @@ async def setup_paper_fund():
     print("\nWelcome! This bot runs in PAPER TRADE mode.")
     print("No real money will be used.\n")
     
-    while True:
-        try:
-            starting_fund = input("Enter your starting fund (USD): $")
-            starting_fund = float(starting_fund)
-            
-            if starting_fund < 10:
-                print("❌ Minimum starting fund is $10")
-                continue
-            
-            if starting_fund > 1000000:
-                print("❌ Maximum starting fund is $1,000,000")
-                continue
-            
-            break
-        except ValueError:
-            print("❌ Please enter a valid number")
+    # Headless runs (Docker, services) set the fund via the environment
+    env_fund = os.getenv("STARTING_FUND")
+    if env_fund:
+        starting_fund = _parse_starting_fund(env_fund)
+        if starting_fund is None:
+            return False
+    else:
+        while True:
+            # Prompt in a worker thread so background tasks keep running
+            raw = await asyncio.to_thread(input, "Enter your starting fund (USD): $")
+            starting_fund = _parse_starting_fund(raw)
+            if starting_fund is not None:
+                break
     
     # Create paper fund
     await db.create_paper_fund(starting_fund)
@@ -63,55 +85,69 @@ async def main():
     await db.init_database()
     print("✓ Database initialized")
     
+    # Resolve API hosts and open pooled connections while the fund is set up
+    dns_task = asyncio.create_task(http_client.prewarm())
+    
     # Setup paper fund
     if not await setup_paper_fund():
         print("Setup failed")
+        dns_task.cancel()
         return
     
-    # Launch all background tasks
-    tasks = []
-    
-    # Resolution engine (Phase 0.5)
-    print("✓ Launching resolution engine...")
-    tasks.append(asyncio.create_task(resolution.check_and_resolve_trades()))
-    
-    # Strategy 1: NegRisk Arbitrage
-    print("✓ Launching NegRisk arbitrage scanner...")
-    tasks.append(asyncio.create_task(negrisk_arb.scan_negrisk_arbitrage()))
-    
-    # Strategy 2: High-Probability Bonds
-    print("✓ Launching high-probability bond scanner...")
-    tasks.append(asyncio.create_task(high_prob_bond.scan_high_prob_bonds()))
-    
-    # Strategy 3: Whale Copy Trading
-    print("✓ Launching whale discovery...")
-    tasks.append(asyncio.create_task(whale_copy.discover_whales_loop()))
-    print("✓ Launching whale monitoring...")
-    tasks.append(asyncio.create_task(whale_copy.monitor_whales_loop()))
-    
-    # Strategy 4: Temporal Arbitrage
-    # DISABLED - Requires external BTC price feeds (CoinGecko has rate limits)
-    # print("✓ Launching temporal arbitrage scanner...")
-    # tasks.append(asyncio.create_task(temporal_arb.scan_temporal_arbitrage()))
-    
-    print("\n" + "="*60)
-    print("✓ All strategies running!")
-    print("="*60)
-    print("\nStarting TUI Dashboard...")
-    await asyncio.sleep(2)  # Give user time to see success messages
-    
-    # Launch TUI
-    from tui.app import PolymarketTUI
-    tui_app = PolymarketTUI()
-    await tui_app.run_async()
-    
-    # Verify cleanup (tasks are cancelled when TUI exits)
-    print("\n\nShutting down...")
-    for task in tasks:
-        task.cancel()
-    print("✓ Bot stopped")
+    # Launch all background tasks - the group cancels them together on exit
+    try:
+        async with asyncio.TaskGroup() as tg:
+            # Deferred log sink for API error paths
+            tg.create_task(logger_async.run_log_sink())
+            
+            # Resolution engine (Phase 0.5)
+            print("✓ Launching resolution engine...")
+            tg.create_task(resolution.check_and_resolve_trades())
+            
+            # Strategy 1: NegRisk Arbitrage
+            print("✓ Launching NegRisk arbitrage scanner...")
+            tg.create_task(negrisk_arb.scan_negrisk_arbitrage())
+            
+            # Strategy 2: High-Probability Bonds
+            print("✓ Launching high-probability bond scanner...")
+            tg.create_task(high_prob_bond.scan_high_prob_bonds())
+            
+            # Strategy 3: Whale Copy Trading
+            print("✓ Launching whale discovery...")
+            tg.create_task(whale_copy.discover_whales_loop())
+            print("✓ Launching whale monitoring...")
+            tg.create_task(whale_copy.monitor_whales_loop())
+            
+            # Strategy 4: Temporal Arbitrage
+            # DISABLED - Requires external BTC price feeds (CoinGecko has rate limits)
+            # print("✓ Launching temporal arbitrage scanner...")
+            # tg.create_task(temporal_arb.scan_temporal_arbitrage())
+            
+            print("\n" + "="*60)
+            print("✓ All strategies running!")
+            print("="*60)
+            print("\nStarting TUI Dashboard...")
+            await asyncio.sleep(2)  # Give user time to see success messages
+            
+            # Launch TUI
+            from tui.app import PolymarketTUI
+            tui_app = PolymarketTUI()
+            await tui_app.run_async()
+            
+            # TUI closed - cancel every background task at once
+            raise _Shutdown
+    except* _Shutdown:
+        pass
+    finally:
+        # Runs on a crashed background task too, so trades still get flushed
+        print("\n\nShutting down...")
+        dns_task.cancel()
+        await http_client.aclose_all()
+        await db.close_db()
+        print("✓ Bot stopped")
 
 if __name__ == "__main__":
+    install_event_loop_policy()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -1,39 +1,28 @@
 """
 Database Migration Script
-Adds asset and resolution_time columns to existing paper_trades table
+Brings an existing database file up to the current schema version
+(asset/resolution_time columns, daily spend and long-form P&L backfills)
 """
 
-import sqlite3
-import config
+import asyncio
+from database import db
 
-def migrate_database():
-    """Add new columns to paper_trades table"""
-    conn = sqlite3.connect(config.DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    # Check if columns already exist
-    cursor.execute("PRAGMA table_info(paper_trades)")
-    columns = [col[1] for col in cursor.fetchall()]
-    
-    # Add asset column if it doesn't exist
-    if 'asset' not in columns:
-        print("Adding 'asset' column to paper_trades table...")
-        cursor.execute("ALTER TABLE paper_trades ADD COLUMN asset TEXT")
-        print("✓ Added 'asset' column")
-    else:
-        print("'asset' column already exists")
-    
-    # Add resolution_time column if it doesn't exist
-    if 'resolution_time' not in columns:
-        print("Adding 'resolution_time' column to paper_trades table...")
-        cursor.execute("ALTER TABLE paper_trades ADD COLUMN resolution_time TEXT")
-        print("✓ Added 'resolution_time' column")
-    else:
-        print("'resolution_time' column already exists")
-    
-    conn.commit()
-    conn.close()
-    print("\n✓ Database migration completed successfully!")
+async def migrate_database():
+    """Run any pending schema migrations"""
+    conn = await db.get_db()
+    try:
+        async with conn.execute("PRAGMA user_version") as cursor:
+            (version,) = await cursor.fetchone()
+        if version >= db.SCHEMA_VERSION:
+            print(f"Database already at schema version {version}")
+            return
+        
+        print(f"Migrating database from schema version {version} to {db.SCHEMA_VERSION}...")
+        # init_database creates any missing tables, then runs migrate_schema
+        await db.init_database()
+        print("\n✓ Database migration completed successfully!")
+    finally:
+        await db.close_db()
 
 if __name__ == "__main__":
-    migrate_database()
+    asyncio.run(migrate_database())
@@ -1,10 +1,12 @@
 import asyncio
-import aiosqlite
-import config
+from database import db as database
 
 async def reset_db():
     print("⚠️  Resetting database...")
-    async with aiosqlite.connect(config.DATABASE_PATH) as db:
+    # Bring an older file up to the current schema so every table below exists
+    await database.init_database()
+    db = await database.get_db()
+    try:
         # 1. Clear paper trades
         await db.execute("DELETE FROM paper_trades")
         print("✓ Cleared paper_trades table")
@@ -26,13 +28,21 @@ async def reset_db():
         
         # 3. Clear daily P&L
         await db.execute("DELETE FROM daily_pnl")
-        print("✓ Cleared daily_pnl table")
+        await db.execute("DELETE FROM daily_pnl_v2")
+        await db.execute("DELETE FROM daily_spend")
+        print("✓ Cleared daily_pnl tables")
         
         # 4. Clear signals (optional, but good for clean slate)
         await db.execute("DELETE FROM signals")
         print("✓ Cleared signals table")
         
         await db.commit()
+    except Exception:
+        # close_db() commits - never let it keep a half-finished reset
+        await db.rollback()
+        raise
+    finally:
+        await database.close_db()
     print("✅ Database reset complete!")
 
 if __name__ == "__main__":
@@ -4,9 +4,12 @@ Scans for contracts trading at 0.95+ and buys them for steady small wins
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 import config
 from apis import gamma, clob
+from apis._concurrency import gather_limited
 from engine import paper_trading
 from tui.logger import tui_print
 
@@ -26,6 +29,19 @@ async def scan_high_prob_bonds():
             tui_print(f"Error in bond scanner: {e}")
             await asyncio.sleep(config.BOND_SCAN_INTERVAL)
 
+_SIDES = ("YES", "NO")
+
+@dataclass
+class BondCandidate:
+    """A market side that passed the price and after-fee profit screen"""
+    market_id: str
+    market_name: str
+    side: str
+    token_id: str
+    price: float
+    profit_per_share: float
+    is_crypto_15min: bool
+
 async def find_and_execute_bonds():
     """
     Scan active crypto markets for high-probability contracts
@@ -33,78 +49,99 @@ async def find_and_execute_bonds():
     # Fetch active crypto markets
     markets = await gamma.fetch_active_crypto_markets()
     
-    for market in markets:
-        # Check both YES and NO sides
-        await check_and_execute_bond(market, "YES")
-        await check_and_execute_bond(market, "NO")
-
-async def check_and_execute_bond(market: Dict[str, Any], side: str):
-    """
-    Check if a specific side qualifies as a bond trade and execute if so
-    """
-    market_id = market.get("id")
-    market_name = market.get("question")
-    
-    # Get token ID for the side we're checking
-    clob_token_ids = market.get("clobTokenIds", [])
-    if not clob_token_ids or not isinstance(clob_token_ids, list) or len(clob_token_ids) < 2:
+    # Parse each market's (YES, NO) token pair once
+    pairs = [(market, tokens) for market in markets if (tokens := _market_tokens(market))]
+    if not pairs:
         return
     
-    token_id = clob_token_ids[0] if side == "YES" else clob_token_ids[1]
+    # One YES price per market prices both sides (NO = 1 - YES)
+    prices = await clob.fetch_multiple_prices([yes_token for _, (yes_token, _) in pairs])
+    survivors = screen_bond_markets(pairs, prices)
     
-    # Validate token_id
-    if not token_id or not isinstance(token_id, str):
-        return
-    
-    # Fetch current price
-    price_data = await clob.fetch_market_price(token_id)
-    if not price_data:
-        return
-    
-    price = float(price_data.get(side.lower(), 0))
-    
-    # Check if price >= bond minimum
-    if price < config.BOND_MIN_PRICE:
-        return
+    # Liquidity still needs one orderbook per survivor - probe concurrently
+    liquid = await gather_limited(
+        (clob.check_liquidity(c.token_id, config.BOND_MIN_LIQUIDITY) for c in survivors),
+        config.BOND_MAX_CONCURRENCY
+    )
     
-    # Check liquidity
-    has_liquidity = await clob.check_liquidity(token_id, config.BOND_MIN_LIQUIDITY)
-    if not has_liquidity:
-        return
+    # Execute serially - each trade changes the balance the next one sizes against
+    for candidate, has_liquidity in zip(survivors, liquid):
+        if has_liquidity:
+            await execute_bond(candidate)
+
+def _market_tokens(market: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Return the market's (YES, NO) token IDs, or None if either is missing
+    """
+    yes_token, no_token = gamma.market_token_ids(market)
+    if yes_token is None or no_token is None:
+        return None
+    return yes_token, no_token
+
+def screen_bond_markets(
+    pairs: List[Tuple[Dict[str, Any], Tuple[str, str]]],
+    prices: Dict[str, Dict[str, float]]
+) -> List[BondCandidate]:
+    """
+    Apply the price floor and after-fee profitability check to both sides
+    of every market in one vectorized pass; only the survivors need a
+    liquidity probe
+    """
+    quotes = [prices.get(yes_token) for _, (yes_token, _) in pairs]
+    has_price = np.array([quote is not None for quote in quotes])
+    yes_price = np.array([quote["yes"] if quote else 0.0 for quote in quotes], dtype=float)
     
-    # Determine if this is a 15-minute crypto market (affects fees)
-    is_crypto_15min = "15" in market_name.lower() or "15m" in market_name.lower()
+    # Column 0 = YES, column 1 = NO
+    price = np.column_stack((yes_price, 1.0 - yes_price))
     
-    # Calculate fee
-    shares_test = 100  # Test with 100 shares
-    fee_per_share = paper_trading.calculate_fee(shares_test, price, is_crypto_15min) / shares_test
+    # Determine if each market is a 15-minute crypto market (affects fees)
+    names = [market.get("question") or "" for market, _ in pairs]
+    is_crypto_15min = np.array(["15" in name for name in names])
+    fee_flags = np.repeat(is_crypto_15min[:, None], 2, axis=1)
     
-    # Calculate profit after fee
+    # Fee for one share, zero for fee-free markets
+    fee_per_share = paper_trading.calculate_fees_batch(np.ones_like(price), price, fee_flags)
     profit_per_share = 1.00 - price - fee_per_share
     
-    # Only execute if profit is positive
-    if profit_per_share <= 0:
-        return
-    
-    # Calculate position size
-    position_size = await paper_trading.calculate_position_size("HIGH_PROB_BOND")
+    keep = has_price[:, None] & (price >= config.BOND_MIN_PRICE) & (profit_per_share > 0)
+    
+    return [
+        BondCandidate(
+            market_id=pairs[i][0].get("id"),
+            market_name=names[i],
+            side=_SIDES[j],
+            token_id=pairs[i][1][j],
+            price=float(price[i, j]),
+            profit_per_share=float(profit_per_share[i, j]),
+            is_crypto_15min=bool(is_crypto_15min[i])
+        )
+        for i, j in zip(*np.nonzero(keep))
+    ]
+
+async def execute_bond(candidate: BondCandidate):
+    """
+    Size and execute a bond trade for a qualifying candidate
+    """
+    # Size and cap against one balance snapshot
+    balance = await paper_trading.get_available_balance()
+    position_size = await paper_trading.calculate_position_size("HIGH_PROB_BOND", balance=balance)
     
     # Cap at max position
-    max_position = await paper_trading.get_available_balance() * config.BOND_MAX_POSITION_PCT
+    max_position = balance * config.BOND_MAX_POSITION_PCT
     position_size = min(position_size, max_position)
     
     # Execute trade
     tui_print(f"\n💰 High-Prob Bond Found!")
-    tui_print(f"Market: {market_name}")
-    tui_print(f"Side: {side} @ ${price:.3f}")
-    tui_print(f"Expected profit: ${profit_per_share:.4f} per share")
+    tui_print(f"Market: {candidate.market_name}")
+    tui_print(f"Side: {candidate.side} @ ${candidate.price:.3f}")
+    tui_print(f"Expected profit: ${candidate.profit_per_share:.4f} per share")
     
     await paper_trading.simulate_trade(
         strategy_id="HIGH_PROB_BOND",
-        market_id=market_id,
-        market_name=market_name,
-        side=side,
-        price=price,
+        market_id=candidate.market_id,
+        market_name=candidate.market_name,
+        side=candidate.side,
+        price=candidate.price,
         position_size_usd=position_size,
-        is_crypto_15min=is_crypto_15min
+        is_crypto_15min=candidate.is_crypto_15min
     )
@@ -1,12 +1,9 @@
 """
 Technical Indicators for Whale Copy Trading
-Calculates RSI, EMA, Volume, and ATR using the ta library
+Calculates RSI, EMA, Volume, and ATR directly with numpy
 """
 
-import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator
-from ta.volatility import AverageTrueRange
+import numpy as np
 from typing import Dict, List, Any, Optional
 import config
 from apis import price_feeds
@@ -32,53 +29,38 @@ async def fetch_btc_indicators() -> Optional[Dict[str, Any]]:
     # if not candles or len(candles) < config.BTC_CANDLE_LIMIT:
     #     return None
     # 
-    # # Convert to pandas DataFrame
-    # df = pd.DataFrame(candles)
-    # 
-    # # Calculate indicators
-    # rsi = calculate_rsi(df)
-    # ema_signal = calculate_ema_crossover(df)
-    # volume_signal = calculate_volume_signal(df)
-    # atr_signal = calculate_atr_signal(df)
-    # 
-    # return {
-    #     "rsi": rsi,
-    #     "ema_signal": ema_signal,  # "UP", "DOWN", or "NEUTRAL"
-    #     "volume_signal": volume_signal,  # "LOW", "NORMAL", or "HIGH"
-    #     "atr_signal": atr_signal  # "HIGH_VOLATILITY" or "NORMAL"
-    # }
+    # return compute_indicators(candles)
 
-def calculate_rsi(df: pd.DataFrame) -> float:
-    """Calculate 14-period RSI"""
-    rsi_indicator = RSIIndicator(close=df["close"], window=config.RSI_PERIOD)
-    rsi_values = rsi_indicator.rsi()
-    return rsi_values.iloc[-1]
+# Smoothing factors for the configured periods (fixed for the process lifetime)
+_RSI_ALPHA = 1 / config.RSI_PERIOD
+_EMA_SHORT_ALPHA = 2 / (config.EMA_SHORT_PERIOD + 1)
+_EMA_LONG_ALPHA = 2 / (config.EMA_LONG_PERIOD + 1)
+_ATR_ALPHA = 1 / config.ATR_PERIOD
 
-def calculate_ema_crossover(df: pd.DataFrame) -> str:
+def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
     """
-    Calculate EMA crossover signal
-    Returns "UP" if short EMA > long EMA, "DOWN" otherwise
+    Recursive EMA (y = y + alpha * (x - y), seeded with the first value)
+    Same output as pandas ewm(adjust=False, min_periods=...).mean(); a plain
+    loop beats ewm's per-call setup on windows of a few dozen candles
     """
-    ema_short = EMAIndicator(close=df["close"], window=config.EMA_SHORT_PERIOD)
-    ema_long = EMAIndicator(close=df["close"], window=config.EMA_LONG_PERIOD)
-    
-    short_values = ema_short.ema_indicator()
-    long_values = ema_long.ema_indicator()
-    
-    if short_values.iloc[-1] > long_values.iloc[-1]:
-        return "UP"
-    else:
-        return "DOWN"
+    out = np.empty(len(values))
+    avg = values[0]
+    for i, x in enumerate(values):
+        avg += alpha * (x - avg)
+        out[i] = avg
+    out[:min_periods - 1] = np.nan
+    return out
 
-def calculate_volume_signal(df: pd.DataFrame) -> str:
-    """
-    Check if current volume is low compared to average
-    Returns "LOW", "NORMAL", or "HIGH"
-    """
-    volumes = df["volume"]
-    avg_volume = volumes.rolling(window=config.VOLUME_LOOKBACK_PERIOD).mean().iloc[-1]
-    current_volume = volumes.iloc[-1]
-    
+def _wilder(values: np.ndarray, alpha: float, period: int) -> np.ndarray:
+    """Wilder smoothing (EMA with alpha = 1/period)"""
+    return _ewm(values, alpha, period)
+
+def _last_ema(values: np.ndarray, alpha: float, period: int) -> float:
+    """Last value of a span-`period` EMA (alpha = 2/(period+1))"""
+    return _ewm(values, alpha, period)[-1]
+
+def _volume_signal(current_volume: float, avg_volume: float) -> str:
+    """Classify volume against its lookback average"""
     if current_volume < avg_volume * config.WHALE_LOW_VOLUME_THRESHOLD:
         return "LOW"
     elif current_volume > avg_volume * 1.5:
@@ -86,26 +68,50 @@ def calculate_volume_signal(df: pd.DataFrame) -> str:
     else:
         return "NORMAL"
 
-def calculate_atr_signal(df: pd.DataFrame) -> str:
+def _atr_signal(current_atr: float, avg_atr: float) -> str:
+    """Classify ATR against its recent average"""
+    if current_atr > avg_atr * config.WHALE_HIGH_VOLATILITY_MULTIPLIER:
+        return "HIGH_VOLATILITY"
+    else:
+        return "NORMAL"
+
+def compute_indicators(candles: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Check if volatility is high using ATR
-    Returns "HIGH_VOLATILITY" or "NORMAL"
+    Calculate every indicator from a candle window
+    One fused pass: each column is materialized once and the diff /
+    true range intermediates feed every indicator that needs them
     """
-    atr_indicator = AverageTrueRange(
-        high=df["high"],
-        low=df["low"],
-        close=df["close"],
-        window=config.ATR_PERIOD
+    # One float64 array per field (no DataFrame, no dtype inference)
+    count = len(candles)
+    close, high, low, volume = (
+        np.fromiter((float(candle[key]) for candle in candles), dtype=np.float64, count=count)
+        for key in ("close", "high", "low", "volume")
     )
-    atr_values = atr_indicator.average_true_range()
-    
-    current_atr = atr_values.iloc[-1]
-    avg_atr = atr_values.rolling(window=config.ATR_PERIOD).mean().iloc[-1]
     
-    if current_atr > avg_atr * config.WHALE_HIGH_VOLATILITY_MULTIPLIER:
-        return "HIGH_VOLATILITY"
+    # RSI (Wilder)
+    delta = np.diff(close)
+    avg_gain = _wilder(np.where(delta > 0, delta, 0.0), _RSI_ALPHA, config.RSI_PERIOD)[-1]
+    avg_loss = _wilder(np.where(delta < 0, -delta, 0.0), _RSI_ALPHA, config.RSI_PERIOD)[-1]
+    if avg_loss == 0:
+        rsi = 100.0
     else:
-        return "NORMAL"
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    
+    # EMA crossover
+    ema_short = _last_ema(close, _EMA_SHORT_ALPHA, config.EMA_SHORT_PERIOD)
+    ema_long = _last_ema(close, _EMA_LONG_ALPHA, config.EMA_LONG_PERIOD)
+    
+    # ATR over the true range against the previous close (first bar has none)
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    true_range = np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    atr_values = _wilder(true_range, _ATR_ALPHA, config.ATR_PERIOD)
+    
+    return {
+        "rsi": rsi,
+        "ema_signal": "UP" if ema_short > ema_long else "DOWN",
+        "volume_signal": _volume_signal(volume[-1], volume[-config.VOLUME_LOOKBACK_PERIOD:].mean()),
+        "atr_signal": _atr_signal(atr_values[-1], atr_values[-config.ATR_PERIOD:].mean())
+    }
 
 def score_indicators(
     indicators: Dict[str, Any],
@@ -121,38 +127,25 @@ def score_indicators(
     2 warnings  → QUARTER SIZE
     3+ warnings → SKIP
     """
-    warnings = 0
-    
+    is_yes = whale_signal_side == "YES"
     rsi = indicators["rsi"]
     ema_signal = indicators["ema_signal"]
-    volume_signal = indicators["volume_signal"]
-    atr_signal = indicators["atr_signal"]
     
-    # Warning 1: RSI overbought/oversold AND whale disagrees
-    if whale_signal_side == "YES":
-        # Whales buying YES (bullish)
-        if rsi > config.WHALE_RSI_OVERBOUGHT:
-            warnings += 1  # Already overbought, risky to buy more
-    else:
-        # Whales buying NO (bearish)
-        if rsi < config.WHALE_RSI_OVERSOLD:
-            warnings += 1  # Already oversold, risky to sell more
-    
-    # Warning 2: EMA trend disagrees with whale signal
-    if whale_signal_side == "YES" and ema_signal == "DOWN":
-        warnings += 1  # Whales bullish but trend is down
-    elif whale_signal_side == "NO" and ema_signal == "UP":
-        warnings += 1  # Whales bearish but trend is up
-    
-    # Warning 3: Low volume
-    if volume_signal == "LOW":
-        warnings += 1
-    
-    # Warning 4: High volatility
-    if atr_signal == "HIGH_VOLATILITY":
-        warnings += 1
-    
-    return warnings
+    # Each check is a bool; the warning count is their sum
+    return (
+        # Warning 1: RSI overbought (whales buying YES) / oversold (whales buying NO)
+        # (int() first - rsi may be a numpy scalar, whose bools add as logical OR)
+        int(rsi > config.WHALE_RSI_OVERBOUGHT if is_yes else rsi < config.WHALE_RSI_OVERSOLD)
+        # Warning 2: EMA trend disagrees with whale signal
+        + ((is_yes and ema_signal == "DOWN") or (whale_signal_side == "NO" and ema_signal == "UP"))
+        # Warning 3: Low volume
+        + (indicators["volume_signal"] == "LOW")
+        # Warning 4: High volatility
+        + (indicators["atr_signal"] == "HIGH_VOLATILITY")
+    )
+
+# Position size multiplier indexed by warning count (3+ → SKIP)
+_POSITION_MULTIPLIERS = (1.0, 0.5, 0.25, 0.0)
 
 def get_position_multiplier(warnings: int) -> float:
     """
@@ -162,11 +155,4 @@ def get_position_multiplier(warnings: int) -> float:
     2 warnings  → 0.25 (QUARTER)
     3+ warnings → 0.0 (SKIP)
     """
-    if warnings == 0:
-        return 1.0
-    elif warnings == 1:
-        return 0.5
-    elif warnings == 2:
-        return 0.25
-    else:
-        return 0.0  # SKIP
+    return _POSITION_MULTIPLIERS[min(warnings, 3)]
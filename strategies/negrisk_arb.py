@@ -8,6 +8,7 @@ import uuid
 from typing import List, Dict, Any, Optional
 import config
 from apis import gamma, clob
+from apis._concurrency import gather_limited
 from engine import paper_trading
 from tui.logger import tui_print
 
@@ -33,19 +34,27 @@ async def find_and_execute_arbitrage():
     """
     # Fetch all active NegRisk events
     events = await gamma.fetch_negrisk_events()
+    events = [event for event in events if event.get("id")]
     
-    for event in events:
-        event_id = event.get("id")
-        if not event_id:
-            continue
-        
-        # Get all markets for this event
-        markets = await gamma.fetch_event_markets(event_id)
-        if not markets or len(markets) < 2:
-            continue
-        
-        # Check for arbitrage opportunity
-        opportunity = await check_arbitrage_opportunity(event, markets)
+    # Get all markets for every event concurrently
+    event_markets = await gather_limited(
+        (gamma.fetch_event_markets(event["id"]) for event in events),
+        config.API_CONCURRENCY_LIMIT
+    )
+    candidates = [
+        (event, markets)
+        for event, markets in zip(events, event_markets)
+        if markets and len(markets) >= 2
+    ]
+    
+    # Price checks are read-only - run them concurrently too
+    opportunities = await gather_limited(
+        (check_arbitrage_opportunity(event, markets) for event, markets in candidates),
+        config.API_CONCURRENCY_LIMIT
+    )
+    
+    # Execute serially - each arbitrage spends balance the next one sizes against
+    for opportunity in opportunities:
         if opportunity:
             await execute_arbitrage(opportunity)
 
@@ -58,26 +67,23 @@ async def check_arbitrage_opportunity(
     
     Returns opportunity dict if found, None otherwise
     """
-    # Get YES prices for all outcomes
-    total_cost = 0.0
-    outcome_prices = []
-    
+    # Collect the YES token for every outcome
+    legs = []
     for market in markets:
-        # Extract token_id safely
-        clob_token_ids = market.get("clobTokenIds")
-        if not clob_token_ids or not isinstance(clob_token_ids, list) or len(clob_token_ids) == 0:
+        token_id = gamma.market_token_ids(market)[0]  # YES token
+        if token_id is None:
             continue
         
-        token_id = clob_token_ids[0]  # YES token
-        if not token_id or not isinstance(token_id, str):
-            continue
-        
-        # Fetch current YES price
-        price_data = await clob.fetch_market_price(token_id)
-        if not price_data:
-            continue
-        
-        yes_price = float(price_data.get("yes", 0))
+        legs.append((market, token_id))
+    
+    # Fetch every YES price in one batch call
+    prices = await clob.fetch_multiple_prices([token_id for _, token_id in legs])
+    
+    total_cost = 0.0
+    outcome_prices = []
+    for market, token_id in legs:
+        price_data = prices.get(token_id)
+        yes_price = float(price_data.get("yes", 0)) if price_data else 0.0
         if yes_price <= 0:
             continue
         
@@ -89,6 +95,10 @@ async def check_arbitrage_opportunity(
             "yes_price": yes_price
         })
     
+    # Nothing priced would otherwise read as a free arbitrage (and divide by zero)
+    if len(outcome_prices) < 2:
+        return None
+    
     # Check if arbitrage exists
     # Total cost must be < $1.00 - buffer
     threshold = 1.00 - config.NEGRISK_BUFFER
@@ -120,9 +130,8 @@ async def execute_arbitrage(opportunity: Dict[str, Any]):
     balance = await paper_trading.get_available_balance()
     max_position = balance * config.NEGRISK_MAX_POSITION_PCT
     
-    # Number of sets = min(max_position / total_cost, balance / total_cost)
-    sets = min(max_position / total_cost, balance / total_cost)
-    sets = int(sets)  # Whole sets only
+    # Whole sets affordable within both the position cap and the balance
+    sets = int(min(max_position, balance) // total_cost)
     
     if sets < 1:
         tui_print(f"Insufficient balance for NegRisk arbitrage: need ${total_cost:.2f}")
@@ -138,21 +147,19 @@ async def execute_arbitrage(opportunity: Dict[str, Any]):
     tui_print(f"Expected profit per set: ${expected_profit:.3f} ({opportunity['roi']*100:.1f}% ROI)")
     tui_print(f"Buying {sets} sets...")
     
-    for outcome in outcomes:
-        market_id = outcome["market_id"]
-        market_name = outcome["market_name"]
-        yes_price = outcome["yes_price"]
-        position_size = yes_price * sets
-        
-        await paper_trading.simulate_trade(
+    # Legs go out together; simulate_trade serializes its own balance checks
+    await asyncio.gather(*(
+        paper_trading.simulate_trade(
             strategy_id="NEGRISK_ARB",
-            market_id=market_id,
-            market_name=market_name,
+            market_id=outcome["market_id"],
+            market_name=outcome["market_name"],
             side="YES",
-            price=yes_price,
-            position_size_usd=position_size,
+            price=outcome["yes_price"],
+            position_size_usd=outcome["yes_price"] * sets,
             is_crypto_15min=False,  # NegRisk is fee-free
             arb_id=arb_id
         )
+        for outcome in outcomes
+    ))
     
     tui_print(f"✓ NegRisk arbitrage executed: {len(outcomes)} legs, {sets} sets, arb_id={arb_id[:8]}...")
@@ -4,10 +4,14 @@ Exploits Polymarket pricing lag vs real BTC price movement
 """
 
 import asyncio
-from datetime import datetime
-from typing import Optional, Dict, Any
+import functools
+import re
+import time
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
 import config
 from apis import gamma, clob, price_feeds
+from apis._dates import parse_iso_timestamp
 from engine import paper_trading
 from tui.logger import tui_print
 
@@ -27,6 +31,15 @@ async def scan_temporal_arbitrage():
             tui_print(f"Error in temporal arb scanner: {e}")
             await asyncio.sleep(config.TEMPORAL_SCAN_INTERVAL)
 
+# Placeholder mispricing model: the expected winner is underpriced below
+# this price and fairly priced at _FAIR_VALUE
+_UNDERPRICED_BELOW = 0.70
+_FAIR_VALUE = 0.90
+
+# Starting BTC price per market window
+# (simplified - need to parse from market description)
+_PLACEHOLDER_STARTING_BTC_PRICE = 105000
+
 async def find_and_execute_temporal_arb():
     """
     Check for temporal arbitrage opportunities
@@ -45,113 +58,113 @@ async def find_and_execute_temporal_arb():
     # Fetch active 15-min BTC markets
     markets = await gamma.fetch_active_crypto_markets()
     
+    now = time.time()
+    candidates = []
     for market in markets:
-        # Check if this is a 15-minute BTC Up/Down market
-        market_name = market.get("question", "")
-        if "15" not in market_name.lower() or "btc" not in market_name.lower():
-            continue
-        
-        if "up" not in market_name.lower() and "down" not in market_name.lower():
-            continue
-        
-        # Check for opportunity
-        opportunity = await check_temporal_opportunity(market, btc_price)
-        if opportunity:
-            await execute_temporal_arb(opportunity)
+        candidate = _temporal_candidate(market, now)
+        if candidate:
+            candidates.append(candidate)
+    
+    if not candidates:
+        return
+    
+    for opportunity in await find_temporal_opportunities(candidates, btc_price):
+        await execute_temporal_arb(opportunity)
+
+# Market filters, compiled once and matched without lower-casing the question
+_BTC_RE = re.compile("btc", re.IGNORECASE)
+_UP_DOWN_RE = re.compile(r"\b(?:up|down)\b", re.IGNORECASE)
+
+@functools.lru_cache(maxsize=4096)
+def _end_timestamp(end_time_str: str) -> float:
+    """Epoch seconds of a market end date (each string is parsed once)"""
+    return parse_iso_timestamp(end_time_str)
 
-async def check_temporal_opportunity(
+def _temporal_candidate(
     market: Dict[str, Any],
-    current_btc_price: float
-) -> Optional[Dict[str, Any]]:
+    now: float
+) -> Optional[Tuple[Dict[str, Any], float, str]]:
     """
-    Check if there's a temporal arbitrage opportunity
+    Cheap per-market checks before any price is fetched
+    Returns (market, time_remaining, yes_token_id) or None
     """
-    market_id = market.get("id")
-    market_name = market.get("question")
+    # Check if this is a 15-minute BTC Up/Down market (cheapest test first)
+    market_name = market.get("question", "")
+    if "15" not in market_name or not _BTC_RE.search(market_name):
+        return None
     
-    # Parse market to get start time, end time, and starting BTC price
-    # (simplified - in production, parse from market metadata)
-    # For now, we'll use placeholder values
+    if not _UP_DOWN_RE.search(market_name):
+        return None
     
     # Get market end time
     end_time_str = market.get("endDate")
     if not end_time_str:
         return None
     
-    end_time = datetime.fromisoformat(end_time_str.replace("Z", "+00:00"))
-    time_remaining = (end_time - datetime.utcnow()).total_seconds()
+    time_remaining = _end_timestamp(end_time_str) - now
     
     # Only consider if < 10 minutes remaining
     if time_remaining > config.TEMPORAL_MAX_TIME_REMAINING:
         return None
     
-    # Get starting BTC price from market metadata
-    # (simplified - need to parse from market description)
-    starting_btc_price = 105000  # Placeholder
-    
-    # Calculate BTC movement
-    btc_move_pct = (current_btc_price - starting_btc_price) / starting_btc_price
-    
-    # Check if BTC has moved significantly
-    if abs(btc_move_pct) < config.TEMPORAL_MIN_MOVE_PCT:
+    # Need both outcome tokens
+    yes_token_id, no_token_id = gamma.market_token_ids(market)
+    if yes_token_id is None or no_token_id is None:
         return None
     
-    # Determine which side should win
-    if btc_move_pct > 0:
-        expected_winner = "YES"  # BTC is Up
-    else:
-        expected_winner = "NO"   # BTC is Down
-    
-    # Fetch current market prices
-    clob_token_ids = market.get("clobTokenIds", [])
-    if not clob_token_ids or not isinstance(clob_token_ids, list) or len(clob_token_ids) < 2:
-        return None
-    
-    yes_token_id = clob_token_ids[0]
-    no_token_id = clob_token_ids[1]
-    
-    # Validate token IDs
-    if not yes_token_id or not isinstance(yes_token_id, str):
-        return None
+    return market, time_remaining, yes_token_id
+
+async def find_temporal_opportunities(
+    candidates: List[Tuple[Dict[str, Any], float, str]],
+    current_btc_price: float
+) -> List[Dict[str, Any]]:
+    """
+    Score all candidate markets at once
+    Prices come from one batched request and the move/mispricing math runs
+    over numpy arrays instead of a Python loop per market
+    """
+    markets = [candidate[0] for candidate in candidates]
+    time_remaining = np.array([candidate[1] for candidate in candidates])
+    token_ids = [candidate[2] for candidate in candidates]
     
-    price_data = await clob.fetch_market_price(yes_token_id)
-    if not price_data:
-        return None
+    # Calculate BTC movement per market window
+    starting_btc_price = np.full(len(candidates), _PLACEHOLDER_STARTING_BTC_PRICE, dtype=float)
+    btc_move_pct = (current_btc_price - starting_btc_price) / starting_btc_price
     
-    yes_price = float(price_data.get("yes", 0))
-    no_price = float(price_data.get("no", 0))
-    
-    # Check for mispricing
-    if expected_winner == "YES":
-        # YES should be priced high, but if it's still low → opportunity
-        if yes_price < 0.70:  # Threshold
-            mispricing_pct = (0.90 - yes_price) / yes_price
-            if mispricing_pct >= config.TEMPORAL_MIN_MISPRICING_PCT:
-                return {
-                    "market_id": market_id,
-                    "market_name": market_name,
-                    "side": "YES",
-                    "price": yes_price,
-                    "btc_move_pct": btc_move_pct,
-                    "time_remaining": time_remaining,
-                    "mispricing_pct": mispricing_pct
-                }
-    else:
-        # NO should be priced high
-        if no_price < 0.70:
-            mispricing_pct = (0.90 - no_price) / no_price
-            if mispricing_pct >= config.TEMPORAL_MIN_MISPRICING_PCT:
-                return {
-                    "market_id": market_id,
-                    "market_name": market_name,
-                    "side": "NO",
-                    "price": no_price,
-                    "btc_move_pct": btc_move_pct,
-                    "time_remaining": time_remaining,
-                    "mispricing_pct": mispricing_pct
-                }
-    
-    return None
+    # Check if BTC has moved significantly
+    moved = np.abs(btc_move_pct) >= config.TEMPORAL_MIN_MOVE_PCT
+    if not moved.any():
+        return []
+    
+    # Fetch current market prices (single /prices round trip)
+    prices = await clob.fetch_multiple_prices(token_ids)
+    yes_price = np.array([prices.get(tid, {}).get("yes", 0.0) for tid in token_ids], dtype=float)
+    has_price = np.array([tid in prices for tid in token_ids])
+    
+    # Expected winner is YES when BTC is up, NO when it's down
+    expect_yes = btc_move_pct > 0
+    side_price = np.where(expect_yes, yes_price, 1.0 - yes_price)
+    
+    # Expected winner still priced low -> opportunity
+    underpriced = (side_price > 0) & (side_price < _UNDERPRICED_BELOW)
+    mispricing_pct = np.divide(
+        _FAIR_VALUE - side_price, side_price,
+        out=np.zeros_like(side_price), where=underpriced
+    )
+    fire = moved & has_price & underpriced & (mispricing_pct >= config.TEMPORAL_MIN_MISPRICING_PCT)
+    
+    return [
+        {
+            "market_id": markets[i].get("id"),
+            "market_name": markets[i].get("question"),
+            "side": "YES" if expect_yes[i] else "NO",
+            "price": float(side_price[i]),
+            "btc_move_pct": float(btc_move_pct[i]),
+            "time_remaining": float(time_remaining[i]),
+            "mispricing_pct": float(mispricing_pct[i])
+        }
+        for i in np.flatnonzero(fire)
+    ]
 
 async def execute_temporal_arb(opportunity: Dict[str, Any]):
     """
@@ -4,25 +4,68 @@ Tracks top traders, detects multi-whale signals, applies technical filters
 """
 
 import asyncio
+import re
+import time
+import traceback
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 import config
 from apis import data, clob
 from database import db
 from engine import paper_trading
 from strategies import indicators
 from apis import gamma
+from apis._cache import ttl_cache
+from apis._concurrency import gather_limited
+from apis._dates import parse_iso_timestamp
 from tui.logger import tui_print
 
 # ============================================================================
 # PHASE 3A: WHALE DISCOVERY & MONITORING
 # ============================================================================
 
-# Global set to track markets currently being processed to prevent race conditions
-PROCESSING_MARKETS = set()
+# In-flight signal check per (market, side) - concurrent callers share it (single-flight)
+PROCESSING_MARKETS: Dict[Tuple[str, str], asyncio.Task] = {}
 
-# Global dict to store market metadata (asset, resolution_time)
-MARKET_METADATA = {}
+@dataclass(slots=True)
+class MarketMeta:
+    """What whale copy remembers about a market between trades"""
+    asset: Optional[str] = "Crypto"        # None for non-crypto markets
+    resolution_time: Optional[str] = None  # ISO end date, stored on copied trades
+    end_date: Optional[str] = None         # End date string resolution_ts was parsed from
+    resolution_ts: Optional[float] = None
+    non_crypto_until: float = 0.0          # Monotonic expiry of a non-crypto verdict
+
+# Global dict to store market metadata by market id
+MARKET_METADATA: Dict[str, MarketMeta] = {}
+
+def _market_meta(market_id: str) -> MarketMeta:
+    """The market's metadata entry, created on first use"""
+    meta = MARKET_METADATA.get(market_id)
+    if meta is None:
+        meta = MARKET_METADATA[market_id] = MarketMeta()
+    return meta
+
+# Crypto asset keywords, compiled once (one case-insensitive pass per question)
+# Whole words only - bare substrings matched "uni" in "United", "eth" in "whether"
+_ASSET_RE = re.compile(
+    r"\b(btc|eth|sol|doge|avax|link|uni|matic|bitcoin|ethereum|solana|cardano|ripple|xrp)\b",
+    re.IGNORECASE
+)
+_ASSET_ALIASES = {"BITCOIN": "BTC", "ETHEREUM": "ETH", "SOLANA": "SOL", "RIPPLE": "XRP"}
+
+def detect_asset(question: str) -> Optional[str]:
+    """
+    Return the ticker of the first crypto asset mentioned in a market
+    question, or None if it isn't a crypto market
+    """
+    match = _ASSET_RE.search(question)
+    if not match:
+        return None
+    asset = match.group(1).upper()
+    return _ASSET_ALIASES.get(asset, asset)
 
 async def discover_whales_loop():
     """
@@ -37,9 +80,9 @@ async def discover_whales_loop():
             await discover_and_vet_whales()
             await asyncio.sleep(config.WHALE_DISCOVERY_INTERVAL)
         except Exception as e:
-            import traceback
-            tui_print(f"❌ Error in whale discovery: {e}")
-            tui_print(f"Traceback: {traceback.format_exc()}")
+            tui_print("❌ Error in whale discovery: %s", e)
+            if config.DEBUG_TRACEBACKS:
+                tui_print("Error traceback: %s", traceback.format_exc())
             await asyncio.sleep(config.WHALE_DISCOVERY_INTERVAL)
 
 async def discover_and_vet_whales():
@@ -54,7 +97,13 @@ async def discover_and_vet_whales():
         
         tui_print(f"📊 Found {len(leaderboard)} traders on leaderboard")
         
-        new_whales_count = 0
+        # Already-tracked wallets (cached set), plus any vetted during this pass
+        existing_wallets = await db.get_active_wallets()
+        added_wallets = set()
+        now_iso = datetime.utcnow().isoformat()
+        
+        # Vetted whales, written in one batch after the loop
+        new_whales = []
         for entry in leaderboard:
             # API returns 'proxyWallet' not 'wallet_address'
             wallet = entry.get("proxyWallet")
@@ -63,10 +112,10 @@ async def discover_and_vet_whales():
                 continue
             
             # Check if already tracking
+            if wallet in existing_wallets or wallet in added_wallets:
+                continue
+            
             try:
-                existing_whales = await db.get_active_whales()
-                if any(w["wallet_address"] == wallet for w in existing_whales):
-                    continue
                 
                 # Convert API response to our format
                 # API provides: proxyWallet, pnl, vol, rank, userName
@@ -78,36 +127,39 @@ async def discover_and_vet_whales():
                     "profit_7d": entry.get("pnl", 0),  # API uses 'pnl' not 'profit_7d'
                     "total_trades": estimated_trades,  # Estimated from volume
                     "win_rate": 0.6,  # API doesn't provide win rate, use default
-                    "last_trade_at": datetime.utcnow().isoformat()
+                    "last_trade_at": now_iso
                 }
                 
                 # Vet whale
-                if await vet_whale(whale_data):
-                    await db.upsert_whale(
-                        wallet_address=wallet,
-                        profit_7d=whale_data["profit_7d"],
-                        total_trades=whale_data["total_trades"],
-                        win_rate=whale_data["win_rate"],
-                        last_trade_at=whale_data["last_trade_at"]
-                    )
-                    new_whales_count += 1
-                    tui_print(f"✓ New whale discovered: {wallet[:10]}... | Profit: ${whale_data['profit_7d']:.0f}")
+                if vet_whale(whale_data):
+                    new_whales.append((
+                        wallet,
+                        whale_data["profit_7d"],
+                        whale_data["total_trades"],
+                        whale_data["win_rate"],
+                        whale_data["last_trade_at"]
+                    ))
+                    added_wallets.add(wallet)
             except Exception as e:
-                tui_print(f"⚠️  Error processing whale {wallet[:10]}...: {e}")
-                import traceback
-                tui_print(f"Traceback: {traceback.format_exc()[:200]}")
+                tui_print("⚠️  Error processing whale %s...: %s", wallet[:10], e)
+                if config.DEBUG_TRACEBACKS:
+                    tui_print("Error traceback: %s", traceback.format_exc()[:200])
                 continue
         
-        if new_whales_count == 0:
+        await db.upsert_whales_bulk(new_whales)
+        for wallet, profit_7d, *_ in new_whales:
+            tui_print(f"✓ New whale discovered: {wallet[:10]}... | Profit: ${profit_7d:.0f}")
+        
+        if not new_whales:
             tui_print("ℹ️  No new whales found (all already tracked)")
         else:
-            tui_print(f"✓ Discovered {new_whales_count} new whales")
+            tui_print(f"✓ Discovered {len(new_whales)} new whales")
     except Exception as e:
-        import traceback
-        tui_print(f"❌ Error in discover_and_vet_whales: {e}")
-        tui_print(f"Traceback: {traceback.format_exc()}")
+        tui_print("❌ Error in discover_and_vet_whales: %s", e)
+        if config.DEBUG_TRACEBACKS:
+            tui_print("Error traceback: %s", traceback.format_exc())
 
-async def vet_whale(whale_data: Dict[str, Any]) -> bool:
+def vet_whale(whale_data: Dict[str, Any]) -> bool:
     """Check if whale meets vetting criteria"""
     profit_7d = whale_data.get("profit_7d", 0)
     total_trades = whale_data.get("total_trades", 0)
@@ -136,9 +188,9 @@ async def monitor_whales_loop():
             await monitor_whale_activity()
             await asyncio.sleep(config.WHALE_MONITOR_INTERVAL)
         except Exception as e:
-            import traceback
-            tui_print(f"❌ Error monitoring whales: {e}")
-            tui_print(f"Traceback: {traceback.format_exc()}")
+            tui_print("❌ Error monitoring whales: %s", e)
+            if config.DEBUG_TRACEBACKS:
+                tui_print("Error traceback: %s", traceback.format_exc())
             await asyncio.sleep(config.WHALE_MONITOR_INTERVAL)
 
 async def monitor_whale_activity():
@@ -152,26 +204,76 @@ async def monitor_whale_activity():
     # Only log monitoring message occasionally to reduce spam
     # tui_print(f"👀 Monitoring {len(whales)} whales for activity...")
     
+    # Fetch every whale's recent trades concurrently (bounded)
+    whale_trades = await gather_limited(
+        (data.fetch_wallet_trades(whale.wallet_address, limit=5) for whale in whales),
+        config.WHALE_MONITOR_CONCURRENCY
+    )
+    
+    # Vet every trade first, then log the cycle's trades in one batch
     trades_found = 0
-    for whale in whales:
-        wallet = whale["wallet_address"]
-        trades = await data.fetch_wallet_trades(wallet, limit=5)
-        
+    pending = []
+    for whale, trades in zip(whales, whale_trades):
+        wallet = whale.wallet_address
         if trades:
             trades_found += len(trades)
             tui_print(f"  📊 Found {len(trades)} recent trades for {wallet[:10]}...")
         
         for trade in trades:
-            # Check if we've already logged this trade
-            # (simplified - in production, check against database)
-            await process_whale_trade(whale, trade)
+            pending_trade = await process_whale_trade(whale, trade)
+            if pending_trade:
+                pending.append(pending_trade)
+    
+    await log_whale_trades(pending)
     
     if trades_found > 0:
         tui_print(f"✓ Processed {trades_found} whale trades")
 
-async def process_whale_trade(whale: Dict[str, Any], trade: Dict[str, Any]):
+# Recently handled whale trades (insertion-ordered, oldest evicted first)
+# The DB duplicate check stays authoritative across restarts
+_SEEN_TRADES: "OrderedDict[tuple, None]" = OrderedDict()
+
+def _remember_trade(key: tuple):
+    """Mark a whale trade as handled, evicting the oldest past the cap"""
+    _SEEN_TRADES[key] = None
+    if len(_SEEN_TRADES) > config.WHALE_SEEN_TRADES_MAX:
+        _SEEN_TRADES.popitem(last=False)
+
+def _resolution_timestamp(market_id: str, end_date_str: str) -> Optional[float]:
     """
-    Process a whale trade and check for signals
+    Epoch seconds of a market's end date
+    End dates don't change, so each market's is parsed once and kept in MARKET_METADATA
+    """
+    meta = _market_meta(market_id)
+    if meta.end_date != end_date_str:
+        try:
+            # ISO format usually "2024-02-02T12:00:00Z"
+            meta.resolution_ts = parse_iso_timestamp(end_date_str)
+        except ValueError:
+            meta.resolution_ts = None
+        meta.end_date = end_date_str
+    return meta.resolution_ts
+
+@ttl_cache(config.WHALE_MARKET_CACHE_TTL, max_size=config.WHALE_MARKET_CACHE_MAX_SIZE)
+async def _get_market_details(market_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Market details for whale trade filtering
+    Popular markets show up in many whales' trades each cycle; question and
+    end date don't change, so open markets are cached here too (gamma only
+    caches resolved ones)
+    """
+    return await gamma.fetch_market_details(market_id)
+
+# A vetted whale trade waiting for the cycle's batch insert
+# row is the (wallet, market_id, side, price, shares) tuple log_whale_trades_bulk takes
+PendingWhaleTrade = namedtuple("PendingWhaleTrade", [
+    "row", "seen_key", "asset", "resolution_time", "time_msg"
+])
+
+async def process_whale_trade(whale: db.WhaleRow, trade: Dict[str, Any]) -> Optional[PendingWhaleTrade]:
+    """
+    Vet a whale trade (crypto market, not already handled)
+    Returns the trade to log, or None if it should be skipped
     
     Polymarket API trade format:
     {
@@ -187,7 +289,7 @@ async def process_whale_trade(whale: Dict[str, Any], trade: Dict[str, Any]):
         "transactionHash": "0x..."
     }
     """
-    wallet = whale["wallet_address"]
+    wallet = whale.wallet_address
     
     # Map Polymarket API fields to our format
     market_id = trade.get("conditionId")  # Polymarket uses conditionId for market
@@ -207,36 +309,40 @@ async def process_whale_trade(whale: Dict[str, Any], trade: Dict[str, Any]):
     if not market_id:
         tui_print(f"  ⚠️  Skipping incomplete trade data: conditionId={market_id}")
         tui_print(f"      Trade keys available: {list(trade.keys())[:10]}")
-        return
+        return None
+    
+    # Trades already logged (or found duplicate) on an earlier poll skip the DB check
+    seen_key = (wallet, trade.get("transactionHash") or (market_id, trade.get("timestamp"), outcome_index))
+    if seen_key in _SEEN_TRADES:
+        return None
+    
+    # Markets already classified as non-crypto skip the details lookup entirely
+    meta = MARKET_METADATA.get(market_id)
+    if meta is not None and meta.non_crypto_until > time.monotonic():
+        return None
     
     # Check if market is a 15-minute crypto market
     # Fetch full market details to verify
     try:
         # Use Gamma API to fetch market info (includes endDate field)
-        market_details = await gamma.fetch_market_details(market_id)
+        market_details = await _get_market_details(market_id)
         
         if not market_details:
             tui_print(f"  ⚠️  Could not fetch details for {market_id}, skipping")
-            return
+            return None
             
         # Check description/question for BTC/ETH and 15m context
-        question = market_details.get("question", "").lower()
+        question = market_details.get("question", "")
         
         # EXTRACT ASSET
-        detected_asset = "Crypto"
-        for asset in ["btc", "eth", "sol", "doge", "avax", "link", "uni", "matic", "bitcoin", "ethereum", "solana", "cardano", "ripple", "xrp"]:
-            if asset in question:
-                detected_asset = asset.upper()
-                if detected_asset == "BITCOIN": detected_asset = "BTC"
-                if detected_asset == "ETHEREUM": detected_asset = "ETH"
-                if detected_asset == "SOLANA": detected_asset = "SOL"
-                if detected_asset == "RIPPLE": detected_asset = "XRP"
-                break
-                
-        if not any(x in question for x in ["btc", "eth", "sol", "doge", "avax", "link", "uni", "matic", "bitcoin", "ethereum", "solana", "cardano", "ripple", "xrp"]):
-            # Not a major crypto market
+        detected_asset = detect_asset(question)
+        if not detected_asset:
+            # Not a major crypto market - remember it so repeat trades skip the lookup
+            meta = _market_meta(market_id)
+            meta.asset = None
+            meta.non_crypto_until = time.monotonic() + config.WHALE_NON_CRYPTO_CACHE_TTL
             tui_print(f"  ℹ️  Skipping non-crypto market ({market_id[:10]}...): '{question}'")
-            return
+            return None
             
         # CALCULATE TIME TO RESOLUTION
         time_msg = ""
@@ -246,58 +352,65 @@ async def process_whale_trade(whale: Dict[str, Any], trade: Dict[str, Any]):
             # Store the original ISO timestamp for database
             resolution_time_iso = end_date_str
             
-            try:
-                # ISO format usually "2024-02-02T12:00:00Z"
-                end_date_clean = end_date_str
-                if end_date_str.endswith("Z"):
-                    end_date_clean = end_date_str[:-1]
-                end_dt = datetime.fromisoformat(end_date_clean)
-                now = datetime.utcnow()
-                delta = end_dt - now
-                
-                hours, remainder = divmod(delta.seconds, 3600)
-                minutes, _ = divmod(remainder, 60)
-                
-                if delta.days < 0:
+            resolution_ts = _resolution_timestamp(market_id, end_date_str)
+            if resolution_ts is not None:
+                remaining = resolution_ts - time.time()
+                if remaining < 0:
                    time_msg = " (Ended)"
                 else:
-                   time_msg = f" | ⏳ Ends: {hours}h {minutes}m"
-            except Exception:
-                pass
+                   hours, remainder = divmod(int(remaining), 3600)
+                   time_msg = f" | ⏳ Ends: {hours}h {remainder // 60}m"
             
         processed_msg = f"  ✓ Verified {detected_asset} market{time_msg}"
         # tui_print(processed_msg) # Optional debug log
         
     except Exception as e:
         tui_print(f"Error validating market type: {e}")
-        return
+        return None
     
+    return PendingWhaleTrade(
+        row=(wallet, market_id, side, price, shares),
+        seen_key=seen_key,
+        asset=detected_asset,
+        resolution_time=resolution_time_iso,
+        time_msg=time_msg
+    )
 
+async def log_whale_trades(pending: List[PendingWhaleTrade]):
+    """
+    Log a monitor cycle's vetted trades in one batch, then check each
+    (market, side) that got a new trade for a multi-whale signal
+    """
+    if not pending:
+        return
+    
     try:
-        was_logged = await db.log_whale_trade(wallet, market_id, side, price, shares)
-        
+        logged = await db.log_whale_trades_bulk([trade.row for trade in pending])
+    except Exception as e:
+        tui_print("  ❌ Error logging whale trades: %s", e)
+        if config.DEBUG_TRACEBACKS:
+            tui_print("      Error traceback: %s", traceback.format_exc()[:200])
+        return
+    
+    # Latest price per (market, side) with a newly logged trade
+    signals: Dict[tuple, float] = {}
+    for trade, was_logged in zip(pending, logged):
+        _remember_trade(trade.seen_key)
         if not was_logged:
-            # Duplicate trade - skip
-            return
-        
-        # Use detected_asset and time_msg from above if available
-        asset_info = locals().get('detected_asset', 'Crypto')
-        time_info = locals().get('time_msg', '')
+            continue  # Duplicate trade
         
-        tui_print(f"  ✓ Logged whale: {wallet[:6]}.. | {asset_info} | {side} @ ${price:.2f}{time_info}")
+        wallet, market_id, side, price, _ = trade.row
+        tui_print(f"  ✓ Logged whale: {wallet[:6]}.. | {trade.asset} | {side} @ ${price:.2f}{trade.time_msg}")
         
-        # Store market metadata for later use (resolution_time_iso is now properly in scope)
-        MARKET_METADATA[market_id] = {
-            'asset': asset_info,
-            'resolution_time': resolution_time_iso
-        }
-        
-        # Check for multi-whale signal
+        # Store market metadata for later use
+        meta = _market_meta(market_id)
+        meta.asset = trade.asset
+        meta.resolution_time = trade.resolution_time
+        signals[(market_id, side)] = price
+    
+    # Check for multi-whale signals
+    for (market_id, side), price in signals.items():
         await check_for_signal(market_id, side, price)
-    except Exception as e:
-        tui_print(f"  ❌ Error logging whale trade: {e}")
-        import traceback
-        tui_print(f"      {traceback.format_exc()[:200]}")
 
 # ============================================================================
 # PHASE 3B: SIGNAL DETECTION
@@ -307,52 +420,45 @@ async def check_for_signal(market_id: str, side: str, price: float):
     """
     Check if multiple whales are buying the same side
     Only creates signal when 2+ whales converge
+    Concurrent calls for one market and side await the check already in
+    flight instead of starting a second one (which could trade it twice);
+    the other side still gets its own check
     """
-    # Concurrency Guard: Don't process if already processing this market
-    if market_id in PROCESSING_MARKETS:
-        return
-        
-    PROCESSING_MARKETS.add(market_id)
+    key = (market_id, side)
+    task = PROCESSING_MARKETS.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_check_market_signal(market_id, side, price))
+        PROCESSING_MARKETS[key] = task
+        task.add_done_callback(lambda _: PROCESSING_MARKETS.pop(key, None))
     
+    # Shield so one caller being cancelled doesn't cancel the shared check
+    await asyncio.shield(task)
+
+async def _check_market_signal(market_id: str, side: str, price: float):
+    """Run one signal check for a market (via check_for_signal)"""
     try:
         # Get recent whale trades for this market (last 5 minutes)
         cutoff_time = datetime.utcnow() - timedelta(seconds=config.WHALE_SIGNAL_WINDOW)
         
-        # Query database for whale trades on this market since cutoff
-        trades = await db.get_whale_trades_for_market(market_id, cutoff_time)
-        
-        if not trades:
-            return  # No trades yet
-        
-        # Count unique whales on each side
-        whales_yes = set()
-        whales_no = set()
-        
-        for trade in trades:
-            if trade['side'] == 'YES':
-                whales_yes.add(trade['wallet_address'])
-            else:
-                whales_no.add(trade['wallet_address'])
-        
-        whale_count = len(whales_yes) if side == 'YES' else len(whales_no)
+        # Count unique whales on each side since cutoff (aggregated in SQL)
+        counts = await db.count_unique_whales_by_side(market_id, cutoff_time)
+        whale_count = counts.get(side, 0)
         
         # Only create signal if we have enough whales
         if whale_count < config.WHALE_SIGNAL_MIN_WHALES:
             return  # Not enough convergence
         
         # Check position limits BEFORE creating signal
-        open_trades = await db.get_open_trades()
-        whale_copy_trades = [t for t in open_trades if t['strategy_id'] == 'whale_copy']
+        open_count, has_position = await db.get_open_position_status("WHALE_COPY", market_id)
         
-        if len(whale_copy_trades) >= 5:  # Max 5 open whale copy positions
+        if open_count >= 5:  # Max 5 open whale copy positions
             tui_print(f"⚠️  Max whale copy positions reached (5/5), skipping signal")
             return
         
         # Check if we already have a position on this market
-        for trade in whale_copy_trades:
-            if trade['market_id'] == market_id:
-                tui_print(f"  ℹ️  Already have position on this market, skipping")
-                return
+        if has_position:
+            tui_print(f"  ℹ️  Already have position on this market, skipping")
+            return
         
         # Determine confidence level based on whale count
         if whale_count >= 3:
@@ -379,13 +485,9 @@ async def check_for_signal(market_id: str, side: str, price: float):
         await execute_whale_copy_trade(market_id, side, confidence, price)
         
     except Exception as e:
-        tui_print(f"❌ Error in check_for_signal: {type(e).__name__}: {e}")
-        import traceback
-        tui_print(f"   {traceback.format_exc()[:300]}")
-    finally:
-        # Release lock
-        if market_id in PROCESSING_MARKETS:
-            PROCESSING_MARKETS.remove(market_id)
+        tui_print("❌ Error in check_for_signal: %s: %s", type(e).__name__, e)
+        if config.DEBUG_TRACEBACKS:
+            tui_print("   Error traceback: %s", traceback.format_exc()[:300])
 
 # ============================================================================
 # PHASE 3C & 3D: INDICATOR FILTER & EXECUTION
@@ -401,9 +503,9 @@ async def execute_whale_copy_trade(
     Execute whale copy trade after applying indicator filters
     """
     # Get market metadata
-    metadata = MARKET_METADATA.get(market_id, {})
-    asset = metadata.get('asset', 'Crypto')
-    resolution_time = metadata.get('resolution_time')
+    meta = MARKET_METADATA.get(market_id) or MarketMeta()
+    asset = meta.asset
+    resolution_time = meta.resolution_time
     
     # Fetch current price
     # (simplified - need to get token_id first)
@@ -415,6 +517,13 @@ async def execute_whale_copy_trade(
         tui_print(f"⚠️  Price moved too much ({price_change*100:.1f}%), skipping whale copy")
         return
     
+    # Calculate base position size (before the indicator fetch - no point
+    # fetching candles for a trade that can't be sized)
+    base_position = await paper_trading.calculate_position_size("WHALE_COPY", confidence)
+    if base_position <= 0:
+        tui_print("⚠️  Whale copy position size is $0 (no balance), skipping")
+        return
+    
     # Fetch BTC indicators
     btc_indicators = await indicators.fetch_btc_indicators()
     
@@ -432,9 +541,6 @@ async def execute_whale_copy_trade(
             tui_print(f"⚠️  Too many indicator warnings ({warnings}), skipping whale copy")
             return
     
-    # Calculate base position size
-    base_position = await paper_trading.calculate_position_size("WHALE_COPY", confidence)
-    
     # Apply multiplier
     final_position = base_position * multiplier
     
@@ -0,0 +1,54 @@
+"""
+Opt-in timing for dashboard refresh work
+Set WIDGET_PROFILE=1 to record call count and cumulative time per name;
+when unset, timed() hands back the original function untouched
+"""
+
+import functools
+import inspect
+import os
+import time
+from collections import Counter
+from typing import List
+
+ENABLED = bool(os.environ.get("WIDGET_PROFILE"))
+
+_calls: Counter = Counter()
+_total_ns: Counter = Counter()
+
+def timed(name: str):
+    """Record count and cumulative time of each call under name"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _total_ns[name] += time.perf_counter_ns() - start
+                    _calls[name] += 1
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _total_ns[name] += time.perf_counter_ns() - start
+                _calls[name] += 1
+        return wrapper
+    return decorator
+
+def dump_stats() -> List[str]:
+    """One line per timed name, slowest cumulative time first"""
+    lines = []
+    for name, total_ns in _total_ns.most_common():
+        calls = _calls[name]
+        total_ms = total_ns / 1e6
+        lines.append(f"{name}: {calls} calls, {total_ms:.1f} ms total, {total_ms / calls:.2f} ms avg")
+    return lines
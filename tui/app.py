@@ -8,13 +8,21 @@ from textual.containers import Container, Grid
 from textual.widgets import Header, Footer, Static, DataTable, Log, Button, Label, Digits
 from textual.reactive import reactive
 from textual.screen import Screen
+from textual.timer import Timer
+from typing import Optional
 import asyncio
+import time
 
 from tui import widgets
+from tui._timing import timed, dump_stats, ENABLED as PROFILE_ENABLED
 from database import db
+from apis._dates import parse_iso_timestamp
 from engine import paper_trading
 import config
 
+# Snapshot read, timed separately from rendering under WIDGET_PROFILE
+_get_dashboard_snapshot = timed("db.get_dashboard_snapshot")(db.get_dashboard_snapshot)
+
 class DashboardScreen(Screen):
     """Main dashboard screen"""
     
@@ -23,7 +31,11 @@ class DashboardScreen(Screen):
         ("t", "toggle_theme", "Toggle Theme"),
         ("r", "refresh", "Force Refresh"),
         ("p", "pause_feed", "Pause/Resume Feed"),
+        ("d", "dump_timings", "Dump Timings"),
     ]
+    
+    # Data refresh interval, set once mounted
+    _refresh_timer: Optional[Timer] = None
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -59,6 +71,24 @@ class DashboardScreen(Screen):
 
     def on_mount(self) -> None:
         """Called when screen is mounted"""
+        # Widgets updated every tick, looked up once
+        self._activity_log = self.query_one("#activity_log", Log)
+        self._positions_table = self.query_one("#positions_table", DataTable)
+        self._global_stats = self.query_one("#global_stats", widgets.GlobalStats)
+        self._pnl_display = self.query_one("#pnl_display", widgets.PnLDisplay)
+        
+        # Messages buffered until the next feed flush
+        self._pending_log = []
+        
+        # Open trades as last fetched, and the (version, minute) last rendered
+        self._open_trades = []
+        self._open_trades_version = -1
+        self._positions_minute = -1
+        
+        # Formatted fields per open trade id - an open trade's row only
+        # changes through its countdown, so the rest is formatted once
+        self._row_cache = {}
+        
         # Register logger callback
         from tui.logger import logger
         logger.set_callback(self.on_log_message)
@@ -67,80 +97,137 @@ class DashboardScreen(Screen):
         self.on_log_message("🚀 Dashboard started - Activity feed is live!")
         self.on_log_message("Monitoring strategies and whale activity...")
         
-        # Start background refresh tasks
-        self.set_interval(config.DASHBOARD_REFRESH_INTERVAL, self.refresh_data)
+        # Start background refresh tasks (the data refresh pauses while hidden)
+        self._refresh_timer = self.set_interval(config.DASHBOARD_REFRESH_INTERVAL, self.refresh_data)
+        self.set_interval(config.LOG_FLUSH_INTERVAL, self._flush_log)
         
         # Setup tables
-        table = self.query_one("#positions_table", DataTable)
-        table.add_columns("Asset", "Side", "Size", "Time Left", "P&L")
+        self._positions_table.add_columns("Asset", "Side", "Size", "Time Left", "P&L")
+
+    def on_screen_suspend(self) -> None:
+        """Stop polling the DB while another screen covers the dashboard"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.pause()
+    
+    async def on_screen_resume(self) -> None:
+        """Catch up immediately, then resume polling"""
+        if self._refresh_timer is None:
+            return  # First show - on_mount starts the timer
+        await self.refresh_data()
+        self._refresh_timer.resume()
 
     def on_log_message(self, message: str) -> None:
-        """Handle incoming log message"""
-        log = self.query_one("#activity_log", Log)
-        log.write(message + "\n")  # Add newline for proper formatting
+        """Handle incoming log message (buffered until the next flush)"""
+        self._pending_log.append(message)
+    
+    @timed("DashboardScreen._flush_log")
+    def _flush_log(self) -> None:
+        """Write buffered messages to the activity feed in one update"""
+        if not self._pending_log:
+            return
+        self._activity_log.write("\n".join(self._pending_log) + "\n")  # Add newline for proper formatting
+        self._pending_log.clear()
 
+    @timed("DashboardScreen.refresh_data")
     async def refresh_data(self) -> None:
         """Refresh all data widgets"""
-        # Trigger updates on widgets
-        self.query_one("#global_stats", widgets.GlobalStats).update_stats()
-        self.query_one("#pnl_display", widgets.PnLDisplay).update_pnl()
+        # One snapshot read feeds both stat widgets
+        snapshot = await _get_dashboard_snapshot()
+        self._global_stats.apply(snapshot)
+        self._pnl_display.apply(snapshot)
         await self.update_positions()
 
+    @timed("DashboardScreen.update_positions")
     async def update_positions(self) -> None:
-        """Update open positions table"""
-        from datetime import datetime
+        """
+        Update open positions table
+        Refetches only after a trade opens or resolves, and re-renders only
+        when that happens or the minute-resolution countdowns tick over
+        """
+        version = db.get_open_trades_version()
+        minute = int(time.time() // 60)
+        if version == self._open_trades_version and minute == self._positions_minute:
+            return
+        
+        if version != self._open_trades_version:
+            self._open_trades = await db.get_open_trades()
+            self._open_trades_version = version
+            # Drop rows for trades that are no longer open
+            open_ids = {trade.id for trade in self._open_trades}
+            self._row_cache = {trade_id: row for trade_id, row in self._row_cache.items() if trade_id in open_ids}
+        self._positions_minute = minute
         
-        table = self.query_one("#positions_table", DataTable)
+        table = self._positions_table
         table.clear()
         
-        trades = await db.get_open_trades()
-        for trade in trades:
-            # Asset
-            asset = trade.get("asset", "Crypto") or "Crypto"
-            
-            # Side with color
-            side = f"[{'green' if trade['side']=='YES' else 'red'}]{trade['side']}[/]"
-            
-            # Size
-            size = f"${trade['cost']:.2f}"
+        now = time.time()
+        for trade in self._open_trades:
+            row = self._row_cache.get(trade.id)
+            if row is None:
+                row = self._row_cache[trade.id] = self._format_position(trade)
+            asset, side, size, resolution_ts, pnl = row
             
             # Time to resolution
             time_left = "Unknown"
-            if trade.get("resolution_time"):
-                try:
-                    res_time = datetime.fromisoformat(trade["resolution_time"].replace("Z", ""))
-                    now = datetime.utcnow()
-                    delta = res_time - now
-                    
-                    if delta.total_seconds() < 0:
-                        time_left = "Ended"
+            if resolution_ts is not None:
+                remaining = resolution_ts - now
+                if remaining < 0:
+                    time_left = "Ended"
+                else:
+                    hours, seconds = divmod(int(remaining), 3600)
+                    minutes = seconds // 60
+                    if hours > 0:
+                        time_left = f"{hours}h {minutes}m"
                     else:
-                        hours = int(delta.total_seconds() // 3600)
-                        minutes = int((delta.total_seconds() % 3600) // 60)
-                        if hours > 0:
-                            time_left = f"{hours}h {minutes}m"
-                        else:
-                            time_left = f"{minutes}m"
-                except:
-                    time_left = "Unknown"
-            
-            # Simulated current pnl (just 0 for now as we don't have live market price here yet)
-            pnl = "$0.00"
+                        time_left = f"{minutes}m"
             
             table.add_row(asset, side, size, time_left, pnl)
     
+    @staticmethod
+    def _format_position(trade: db.PaperTradeRow) -> tuple:
+        """Fixed display fields of an open trade: (asset, side, size, resolution_ts, pnl)"""
+        # Asset
+        asset = trade.asset or "Crypto"
+        
+        # Side with color
+        side = f"[{'green' if trade.side=='YES' else 'red'}]{trade.side}[/]"
+        
+        # Size
+        size = f"${trade.cost:.2f}"
+        
+        # Resolution time as a timestamp (None if missing or unparseable)
+        resolution_ts = None
+        if trade.resolution_time:
+            try:
+                resolution_ts = parse_iso_timestamp(trade.resolution_time)
+            except ValueError:
+                pass
+        
+        # Simulated current pnl (just 0 for now as we don't have live market price here yet)
+        pnl = "$0.00"
+        
+        return asset, side, size, resolution_ts, pnl
+    
     def action_pause_feed(self) -> None:
         """Toggle pause/resume of activity feed"""
         from tui.logger import logger
+        self._flush_log()  # Keep the marker after everything logged so far
         
         if logger.is_paused():
             logger.resume()
-            log = self.query_one("#activity_log", Log)
-            log.write("▶️  Activity feed resumed")
+            self._activity_log.write("▶️  Activity feed resumed")
         else:
-            log = self.query_one("#activity_log", Log)
-            log.write("⏸️  Activity feed paused")
+            self._activity_log.write("⏸️  Activity feed paused")
             logger.pause()
+    
+    def action_dump_timings(self) -> None:
+        """Write refresh timings to the activity feed (WIDGET_PROFILE only)"""
+        if not PROFILE_ENABLED:
+            self.on_log_message("⏱️  Timings disabled - run with WIDGET_PROFILE=1")
+            return
+        self.on_log_message("⏱️  Refresh timings (slowest first):")
+        for line in dump_stats() or ["no calls recorded yet"]:
+            self.on_log_message(f"   {line}")
 
 class SetupScreen(Screen):
     """First-run setup screen"""
@@ -169,5 +256,7 @@ class PolymarketTUI(App):
         self.push_screen(DashboardScreen())
 
 if __name__ == "__main__":
+    from engine.event_loop import install_event_loop_policy
+    install_event_loop_policy()
     app = PolymarketTUI()
     app.run()
@@ -23,8 +23,12 @@ class TUILogger:
             cls._instance = cls()
         return cls._instance
 
-    def log(self, message: str):
-        """Log a message to the TUI (and print as backup)"""
+    def log(self, message: str, *args):
+        """
+        Log a message to the TUI (and print as backup)
+        With args, message is a %-format template that is only rendered
+        if the message is actually shown
+        """
         # If paused, don't log
         if self._paused:
             return
@@ -33,11 +37,14 @@ class TUILogger:
         is_error = "Error" in message or "error" in message
         
         if is_error:
-            current_time = time.time()
+            current_time = time.monotonic()
             self._error_timestamps.append(current_time)
             
-            # Check error rate (errors in last second)
-            recent_errors = sum(1 for t in self._error_timestamps if current_time - t < 1.0)
+            # Check error rate (errors in last second) - drop expired
+            # timestamps from the front so the deque length is the rate
+            while current_time - self._error_timestamps[0] >= 1.0:
+                self._error_timestamps.popleft()
+            recent_errors = len(self._error_timestamps)
             
             if recent_errors > self._error_threshold:
                 self._suppressed_count += 1
@@ -55,7 +62,7 @@ class TUILogger:
         
         # If callback is registered (TUI running), send to it
         if self._callback:
-            self._callback(message)
+            self._callback(message % args if args else message)
 
     def set_callback(self, callback: Callable[[str], None]):
         self._callback = callback
@@ -76,6 +83,10 @@ class TUILogger:
 # Global logger
 logger = TUILogger.get_instance()
 
-def tui_print(message: str):
-    """Helper to replace print() in strategies"""
-    logger.log(message)
+def tui_print(message: str, *args):
+    """
+    Helper to replace print() in strategies
+    Hot paths pass a %-format template plus args to skip formatting
+    when the feed is paused or suppressed
+    """
+    logger.log(message, *args)
@@ -0,0 +1,46 @@
+"""
+Deferred logging for hot error paths
+Callers only enqueue the message; a single consumer task hands it to the
+real TUI logger so error-heavy loops never block on rendering
+"""
+
+import asyncio
+from typing import Optional
+import config
+from tui.logger import tui_print
+
+_queue: Optional[asyncio.Queue] = None
+_dropped: int = 0
+
+def tui_print_nowait(message: str, *args):
+    """
+    Queue a message for the TUI without rendering it inline
+    With args, message is a %-format template formatted by the sink
+    Falls back to tui_print when no sink is running (scripts, tests)
+    and drops messages when the queue is full
+    """
+    global _dropped
+    if _queue is None:
+        tui_print(message, *args)
+        return
+    try:
+        _queue.put_nowait((message, args))
+    except asyncio.QueueFull:
+        _dropped += 1
+
+async def run_log_sink():
+    """
+    Consume queued messages and render them through tui_print
+    Run once as a background task for the lifetime of the bot
+    """
+    global _queue, _dropped
+    _queue = asyncio.Queue(maxsize=config.LOG_QUEUE_MAX_SIZE)
+    try:
+        while True:
+            message, args = await _queue.get()
+            if _dropped:
+                tui_print("⚠️  Log queue full - dropped %d messages", _dropped)
+                _dropped = 0
+            tui_print(message, *args)
+    finally:
+        _queue = None
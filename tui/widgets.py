@@ -5,10 +5,33 @@ Custom reusable widgets for the dashboard
 
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
-from textual.widgets import Static, Label, Digits
+from textual.widgets import Static, Label
 from textual.reactive import reactive
-import asyncio
 from database import db
+from tui._timing import timed
+
+__all__ = ["StrategyStatus", "GlobalStats", "PnLDisplay"]
+
+# Label templates, bound once (sign picks the template - no per-tick closures)
+_BALANCE = "${:,.2f}".format
+_TOTAL_PNL_POS = "[green]${:,.2f}[/]".format
+_TOTAL_PNL_NEG = "[red]-${:,.2f}[/]".format
+# Indexed by (val >= 0): negative template first, positive second
+_PNL_FMTS = ("[red]-${:.2f}[/]".format, "[green]${:.2f}[/]".format)
+_PNL_TOTAL_LINE = "Total: {}".format
+_PNL_LINE1 = "NR: {} | Bonds: {}".format
+_PNL_LINE2 = "Whale: {} | Temp: {}".format
+
+def _fmt_pnl(val: float) -> str:
+    """Color code a P&L value based on positive/negative"""
+    positive = val >= 0
+    return _PNL_FMTS[positive](val if positive else -val)
+
+def _update_if_changed(widget: Static, text: str, rendered: dict) -> None:
+    """Update a label only when its text differs from the last one rendered"""
+    if rendered.get(widget.id) != text:
+        rendered[widget.id] = text
+        widget.update(text)
 
 class StrategyStatus(Container):
     """Widget to display status of a single strategy"""
@@ -22,91 +45,87 @@ class StrategyStatus(Container):
         
     def compose(self) -> ComposeResult:
         yield Label(self.strategy_name, classes="strategy-name")
-        yield Label("●", classes="strategy-indicator")
+        # Kept so updates don't re-query the DOM
+        self._indicator = Label("●", classes="strategy-indicator")
+        yield self._indicator
 
     def watch_active(self, active: bool) -> None:
-        self.remove_class("active")
-        self.remove_class("inactive")
-        
-        if active:
-            self.add_class("active")
-            self.query_one(".strategy-indicator", Label).update("[green]●[/]")
-        else:
-            self.add_class("inactive")
-            self.query_one(".strategy-indicator", Label).update("[red]●[/]")
+        # Reactive watchers only fire on an actual change of value
+        self.set_class(active, "active")
+        self.set_class(not active, "inactive")
+        self._indicator.update("[green]●[/]" if active else "[red]●[/]")
 
 class GlobalStats(Container):
     """Widget for global statistics (Balance, P&L)"""
     
     def compose(self) -> ComposeResult:
+        # Value labels are kept so updates don't re-query the DOM
+        # Last text rendered per label id (unchanged values skip the repaint)
+        self._rendered = {}
+        self._balance = Label("$0.00", id="val_balance", classes="stat-value")
+        self._pnl = Label("$0.00", id="val_pnl", classes="stat-value")
+        self._whales = Label("0", id="val_whales", classes="stat-value")
+        
         with Horizontal(classes="stat-row"):
             yield Label("Balance:", classes="stat-label")
-            yield Label("$0.00", id="val_balance", classes="stat-value")
+            yield self._balance
         
         with Horizontal(classes="stat-row"):
             yield Label("All-Time P&L:", classes="stat-label")
-            yield Label("$0.00", id="val_pnl", classes="stat-value")
+            yield self._pnl
             
         with Horizontal(classes="stat-row"):
             yield Label("Active Whales:", classes="stat-label")
-            yield Label("0", id="val_whales", classes="stat-value")
-
-    def update_stats(self) -> None:
-        """Fetch updated stats from DB and update labels"""
-        # This needs to be async, but Textual's on_interval isn't inherently async
-        # We'll use asyncio.create_task to run the DB fetch
-        asyncio.create_task(self._fetch_and_update())
+            yield self._whales
 
-    async def _fetch_and_update(self):
-        fund = await db.get_paper_fund()
+    @timed("GlobalStats.apply")
+    def apply(self, snapshot: db.DashboardSnapshot) -> None:
+        """Update labels from a dashboard snapshot"""
+        fund = snapshot.fund
         if fund:
-            balance = f"${fund['current_balance']:,.2f}"
-            pnl_val = fund['total_profit'] - fund['total_loss']
-            pnl = f"[green]${pnl_val:,.2f}[/]" if pnl_val >= 0 else f"[red]-${abs(pnl_val):,.2f}[/]"
+            balance = _BALANCE(fund.current_balance)
+            pnl_val = fund.total_profit - fund.total_loss
+            pnl = _TOTAL_PNL_POS(pnl_val) if pnl_val >= 0 else _TOTAL_PNL_NEG(-pnl_val)
             
-            self.query_one("#val_balance", Label).update(balance)
-            self.query_one("#val_pnl", Label).update(pnl)
+            _update_if_changed(self._balance, balance, self._rendered)
+            _update_if_changed(self._pnl, pnl, self._rendered)
             
-        whales = await db.get_active_whales()
-        self.query_one("#val_whales", Label).update(str(len(whales)))
+        _update_if_changed(self._whales, str(snapshot.whale_count), self._rendered)
 
 class PnLDisplay(Container):
     """Widget to display P&L breakdown by strategy"""
     
     def compose(self) -> ComposeResult:
-        # Vertical layout with separate labels
-        yield Static("Total: $0.00", id="pnl_total", classes="pnl-line")
-        yield Static("NR: $0 | Bonds: $0", id="pnl_line1", classes="pnl-line-small")
-        yield Static("Whale: $0 | Temp: $0", id="pnl_line2", classes="pnl-line-small")
+        # Vertical layout with separate labels (kept so updates don't re-query the DOM)
+        # Last text rendered per label id (unchanged values skip the repaint)
+        self._rendered = {}
+        self._total = Static("Total: $0.00", id="pnl_total", classes="pnl-line")
+        self._line1 = Static("NR: $0 | Bonds: $0", id="pnl_line1", classes="pnl-line-small")
+        self._line2 = Static("Whale: $0 | Temp: $0", id="pnl_line2", classes="pnl-line-small")
+        yield self._total
+        yield self._line1
+        yield self._line2
 
-    def update_pnl(self) -> None:
-        asyncio.create_task(self._fetch_pnl())
-        
-    async def _fetch_pnl(self):
-        daily = await db.get_daily_pnl()
+    @timed("PnLDisplay.apply")
+    def apply(self, snapshot: db.DashboardSnapshot) -> None:
+        """Update the P&L lines from a dashboard snapshot"""
+        daily = snapshot.daily
         if daily:
             # Format values
-            total = daily['total_pnl']
-            negrisk = daily.get('negrisk_arb_pnl', 0)
-            bond = daily.get('high_prob_bond_pnl', 0)
-            whale = daily.get('whale_copy_pnl', 0)
-            temporal = daily.get('temporal_arb_pnl', 0)
-            
-            # Color code based on positive/negative
-            def fmt(val):
-                if val >= 0:
-                    return f"[green]${val:.2f}[/]"
-                else:
-                    return f"[red]-${abs(val):.2f}[/]"
+            total = daily.total_pnl
+            negrisk = daily.negrisk_arb_pnl or 0
+            bond = daily.high_prob_bond_pnl or 0
+            whale = daily.whale_copy_pnl or 0
+            temporal = daily.temporal_arb_pnl or 0
             
             # Update displays across 3 lines
-            self.query_one("#pnl_total", Static).update(f"Total: {fmt(total)}")
-            self.query_one("#pnl_line1", Static).update(f"NR: {fmt(negrisk)} | Bonds: {fmt(bond)}")
-            self.query_one("#pnl_line2", Static).update(f"Whale: {fmt(whale)} | Temp: {fmt(temporal)}")
+            _update_if_changed(self._total, _PNL_TOTAL_LINE(_fmt_pnl(total)), self._rendered)
+            _update_if_changed(self._line1, _PNL_LINE1(_fmt_pnl(negrisk), _fmt_pnl(bond)), self._rendered)
+            _update_if_changed(self._line2, _PNL_LINE2(_fmt_pnl(whale), _fmt_pnl(temporal)), self._rendered)
         else:
             # No data yet
-            self.query_one("#pnl_total", Static).update("Total: $0.00")
-            self.query_one("#pnl_line1", Static).update("NR: $0 | Bonds: $0")
-            self.query_one("#pnl_line2", Static).update("Whale: $0 | Temp: $0")
+            _update_if_changed(self._total, "Total: $0.00", self._rendered)
+            _update_if_changed(self._line1, "NR: $0 | Bonds: $0", self._rendered)
+            _update_if_changed(self._line2, "Whale: $0 | Temp: $0", self._rendered)
 
 